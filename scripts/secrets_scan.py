@@ -25,13 +25,35 @@ Usage:
 from __future__ import annotations
 
 import argparse
+import bisect
+import io
+import math
+import mmap
+import os
 import re
 import subprocess
 import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 from typing import TYPE_CHECKING
 
+try:
+    import hyperscan
+except ImportError:  # optional: SIMD multi-pattern prefilter
+    hyperscan = None
+
+try:
+    import re2
+except ImportError:  # optional: linear-time regex engine for the candidate scan
+    re2 = None
+
+try:
+    import ahocorasick
+except ImportError:  # optional: C Aho-Corasick automaton for literal lookups
+    ahocorasick = None
+
 if TYPE_CHECKING:
     pass  # For future type imports
 
@@ -68,6 +90,9 @@ SKIP_PATTERNS = [
     r"\.(png|jpg|jpeg|gif|ico|webp|mp4|mov|avi|mkv|mp3|wav|pdf|zip|gz|tar|bz2)$",
 ]
 
+# All skip patterns as one alternation, matched once per path
+SKIP_RE = re.compile("|".join(f"(?:{pattern})" for pattern in SKIP_PATTERNS), re.IGNORECASE)
+
 # Known public/safe values that should NOT trigger alerts
 # These are intentionally public (from CLAUDE.md)
 ALLOWLIST = [
@@ -96,10 +121,62 @@ ALLOWLIST = [
     "secrets.PYPI_TOKEN",
 ]
 
+# Case-insensitive substring tests, compiled once instead of lowering per call
+ALLOWLIST_RE = re.compile("|".join(re.escape(allowed) for allowed in ALLOWLIST), re.IGNORECASE)
+
+# Markers of documentation placeholders rather than real secrets
+PLACEHOLDERS = ["example", "placeholder", "your_", "your-", "<", ">", "xxx", "test"]
+PLACEHOLDER_RE = re.compile("|".join(re.escape(placeholder) for placeholder in PLACEHOLDERS), re.IGNORECASE)
+
+
+def build_automaton(words: list[str]):
+    """Build an Aho-Corasick automaton over the lowercased ``words``.
+
+    Returns None when the optional pyahocorasick module is not installed.
+    """
+    if ahocorasick is None:
+        return None
+
+    automaton = ahocorasick.Automaton()
+    for word in words:
+        automaton.add_word(word.lower(), word)
+    automaton.make_automaton()
+    return automaton
+
+
+ALLOWLIST_AUTOMATON = build_automaton(ALLOWLIST)
+PLACEHOLDER_AUTOMATON = build_automaton(PLACEHOLDERS)
+
+
+def contains_any(text: str, regex: re.Pattern, automaton) -> bool:
+    """Return True if ``text`` contains one of the literals behind ``regex``.
+
+    ASCII text goes through the automaton, where lowercasing matches what
+    IGNORECASE does. Other text keeps the regex, which also folds non-ASCII
+    characters such as the Kelvin sign onto their ASCII letters.
+    """
+    if automaton is not None and text.isascii():
+        return next(automaton.iter(text.lower()), None) is not None
+    return regex.search(text) is not None
+
 # Entropy threshold for high-entropy string detection
 MIN_ENTROPY_THRESHOLD = 4.0
 MIN_SECRET_LENGTH = 16
 
+# c * log2(c) for every character count a capture shorter than 1024 can have
+COUNT_LOG_TABLE = [0.0] + [count * math.log2(count) for count in range(1, 1024)]
+
+# Leading bytes checked for NUL when deciding whether a file is binary
+BINARY_SNIFF_BYTES = 8192
+
+# Larger files (generated data, fixtures) are skipped with a warning; files
+# from MMAP_MIN_BYTES up are mapped rather than read into a bytes copy
+MAX_SCAN_BYTES = 2 * 1024 * 1024
+MMAP_MIN_BYTES = 256 * 1024
+
+# Below this many files a process pool costs more to start than it saves
+PARALLEL_MIN_FILES = 32
+
 
 @dataclass
 class SecretPattern:
@@ -280,6 +357,97 @@ SECRET_PATTERNS = [
 ]
 
 
+def scoped_pattern_source(pattern: re.Pattern) -> str:
+    """Return a pattern's source with any leading inline flag scoped to a group.
+
+    Global inline flags such as ``(?i)`` are only valid at the very start of a
+    regex, so each pattern is wrapped before joining it into a union.
+    """
+    source = pattern.pattern
+    if source.startswith("(?i)"):
+        return f"(?i:{source[4:]})"
+    return f"(?:{source})"
+
+
+# Union of all SECRET_PATTERNS. Text with no match here cannot match any
+# individual pattern, so clean lines cost one regex call instead of one per
+# pattern. Lines that do hit still run every pattern: a leftmost union match
+# would hide overlapping findings from other patterns on the same text.
+SECRET_PREFILTER = re.compile("|".join(scoped_pattern_source(p.pattern) for p in SECRET_PATTERNS))
+
+
+# Lookahead/lookbehind groups, which RE2 does not support
+LOOKAROUND_RE = re.compile(r"\(\?<?[=!][^()]*\)")
+
+# Everything Python's Unicode \s matches; RE2's \s is ASCII-only
+UNICODE_SPACE = r"\t\n\v\f\r \x1c-\x1f\x85\xa0\x{1680}\x{2000}-\x{200a}\x{2028}\x{2029}\x{202f}\x{205f}\x{3000}"
+
+
+def build_candidate_regex():
+    """Compile the union used to find candidate lines in a whole file.
+
+    With the optional re2 module this is an RE2 translation of SECRET_PREFILTER,
+    which runs in time linear in the input however the patterns backtrack.
+    The translation drops lookarounds and widens whitespace classes to Python's
+    Unicode set, so it matches a superset of the stdlib union; per-line matches
+    are still confirmed with ``re``. Falls back to SECRET_PREFILTER itself.
+    """
+    if re2 is None:
+        return SECRET_PREFILTER
+
+    source = LOOKAROUND_RE.sub("", SECRET_PREFILTER.pattern)
+    source = source.replace(r"[^\s", "[^" + UNICODE_SPACE).replace(r"\s", f"[{UNICODE_SPACE}]")
+    return re2.compile(source)
+
+
+CANDIDATE_RE = build_candidate_regex()
+
+NEWLINE_RE = re.compile("\n")
+
+
+def build_hyperscan_database():
+    """Compile SECRET_PATTERNS into a Hyperscan block-mode database.
+
+    Patterns are compiled in prefilter mode, which approximates constructs
+    Hyperscan cannot run (the AKIA lookarounds) with a superset. The database
+    can therefore only rule files out; matches are confirmed with ``re``.
+    Returns None when the optional hyperscan module is not installed.
+    """
+    if hyperscan is None:
+        return None
+
+    expressions = []
+    flags = []
+    for secret_pattern in SECRET_PATTERNS:
+        source = secret_pattern.pattern.pattern
+        pattern_flags = hyperscan.HS_FLAG_PREFILTER | hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP
+        if source.startswith("(?i)"):
+            source = source[4:]
+            pattern_flags |= hyperscan.HS_FLAG_CASELESS
+        expressions.append(source.encode())
+        flags.append(pattern_flags)
+
+    database = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+    database.compile(expressions=expressions, ids=list(range(len(expressions))), elements=len(expressions), flags=flags)
+    return database
+
+
+HYPERSCAN_DB = build_hyperscan_database()
+
+
+def hyperscan_may_match(data: bytes) -> bool:
+    """Return True if any secret pattern may match somewhere in ``data``."""
+
+    def on_match(pattern_id: int, start: int, end: int, flags: int, context: object) -> bool:
+        return True  # Stop at the first candidate
+
+    try:
+        HYPERSCAN_DB.scan(data, match_event_handler=on_match)
+    except hyperscan.ScanTerminated:
+        return True
+    return False
+
+
 @dataclass
 class Finding:
     """A secret finding."""
@@ -294,39 +462,32 @@ class Finding:
 
 
 def calculate_entropy(s: str) -> float:
-    """Calculate Shannon entropy of a string."""
-    import math
-    from collections import Counter
+    """Calculate Shannon entropy of a string.
 
+    Uses H = log2(n) - sum(c * log2(c)) / n over the character counts c, with
+    c * log2(c) looked up from COUNT_LOG_TABLE for typical capture lengths.
+    """
     if not s:
         return 0.0
 
-    counter = Counter(s)
     length = len(s)
-    entropy = 0.0
-
-    for count in counter.values():
-        if count > 0:
-            freq = count / length
-            entropy -= freq * math.log2(freq)
+    counts = Counter(s).values()
+    if length < len(COUNT_LOG_TABLE):
+        weighted = sum(map(COUNT_LOG_TABLE.__getitem__, counts))
+    else:
+        weighted = sum(count * math.log2(count) for count in counts)
 
-    return entropy
+    return math.log2(length) - weighted / length
 
 
 def should_skip_file(filepath: str) -> bool:
     """Check if file should be skipped based on patterns."""
-    for pattern in SKIP_PATTERNS:
-        if re.search(pattern, filepath, re.IGNORECASE):
-            return True
-    return False
+    return SKIP_RE.search(filepath) is not None
 
 
 def is_allowlisted(text: str) -> bool:
     """Check if text contains an allowlisted value."""
-    for allowed in ALLOWLIST:
-        if allowed.lower() in text.lower():
-            return True
-    return False
+    return contains_any(text, ALLOWLIST_RE, ALLOWLIST_AUTOMATON)
 
 
 def scan_line(line: str, line_number: int, filepath: str) -> list[Finding]:
@@ -339,6 +500,9 @@ def scan_line(line: str, line_number: int, filepath: str) -> list[Finding]:
         # Still check for actual secrets in comments
         pass
 
+    if SECRET_PREFILTER.search(line) is None:
+        return findings
+
     for secret_pattern in SECRET_PATTERNS:
         matches = secret_pattern.pattern.finditer(line)
         for match in matches:
@@ -349,7 +513,7 @@ def scan_line(line: str, line_number: int, filepath: str) -> list[Finding]:
                 continue
 
             # Skip if it's a placeholder pattern
-            if any(placeholder in matched_text.lower() for placeholder in ["example", "placeholder", "your_", "your-", "<", ">", "xxx", "test"]):
+            if contains_any(matched_text, PLACEHOLDER_RE, PLACEHOLDER_AUTOMATON):
                 continue
 
             # For patterns that capture groups, check the captured value
@@ -378,47 +542,114 @@ def scan_line(line: str, line_number: int, filepath: str) -> list[Finding]:
     return findings
 
 
+def read_fd(fd: int, size: int) -> bytes:
+    """Read ``size`` bytes from an open file descriptor."""
+    data = os.read(fd, size)
+    while len(data) < size:
+        chunk = os.read(fd, size - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
 def scan_file(filepath: Path) -> list[Finding]:
-    """Scan a file for secrets."""
+    """Scan a file for secrets.
+
+    Files are opened with plain os calls, skipping the TextIOWrapper and
+    BufferedReader layers of Path.read_text. Files above MAX_SCAN_BYTES are
+    skipped; from MMAP_MIN_BYTES up the file is mapped instead of copied.
+    """
     findings: list[Finding] = []
 
     if should_skip_file(str(filepath)):
         return findings
 
     try:
-        content = filepath.read_text(encoding="utf-8", errors="ignore")
-    except (OSError, IOError) as e:
+        fd = os.open(filepath, os.O_RDONLY | getattr(os, "O_CLOEXEC", 0))
+    except FileNotFoundError:
+        # Listed by git but deleted in the working tree
+        return findings
+    except OSError as e:
+        print(f"Warning: Could not read {filepath}: {e}", file=sys.stderr)
+        return findings
+
+    try:
+        size = os.fstat(fd).st_size
+        if size > MAX_SCAN_BYTES:
+            print(f"Warning: Skipping {filepath}: {size} bytes exceeds the {MAX_SCAN_BYTES} byte limit", file=sys.stderr)
+            return findings
+        if size >= MMAP_MIN_BYTES:
+            with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as data:
+                return scan_buffer(data, str(filepath))
+        return scan_buffer(read_fd(fd, size), str(filepath))
+    except OSError as e:
         print(f"Warning: Could not read {filepath}: {e}", file=sys.stderr)
         return findings
+    finally:
+        os.close(fd)
 
-    for line_number, line in enumerate(content.splitlines(), start=1):
-        findings.extend(scan_line(line, line_number, str(filepath)))
+
+def scan_buffer(data: bytes | mmap.mmap, filepath: str) -> list[Finding]:
+    """Scan the raw contents of one file for secrets."""
+    findings: list[Finding] = []
+
+    # Binary files that slipped past SKIP_PATTERNS: a NUL in the first 8 KiB is
+    # the same heuristic git and file(1) use
+    if not data or data.find(b"\0", 0, BINARY_SNIFF_BYTES) != -1:
+        return findings
+
+    try:
+        content = str(data, "utf-8")
+    except UnicodeDecodeError:
+        content = str(data, "utf-8", "ignore")
+        data = content.encode("utf-8")  # Hyperscan's UTF-8 mode needs valid input
+
+    # Most files contain no candidate at all; rule them out in one SIMD pass
+    if HYPERSCAN_DB is not None and not hyperscan_may_match(data):
+        return findings
+
+    # One union scan over the whole buffer finds the candidate lines; only those
+    # go through the per-pattern scan. A union match can run across a newline
+    # (patterns use \s), so every line it spans becomes a candidate.
+    line_starts: list[int] = []
+    candidates: set[int] = set()
+    for match in CANDIDATE_RE.finditer(content):
+        if not line_starts:
+            line_starts = [0, *(newline.end() for newline in NEWLINE_RE.finditer(content))]
+        first = bisect.bisect_right(line_starts, match.start()) - 1
+        last = bisect.bisect_right(line_starts, match.end() - 1) - 1
+        candidates.update(range(first, last + 1))
+
+    for index in sorted(candidates):
+        start = line_starts[index]
+        end = line_starts[index + 1] - 1 if index + 1 < len(line_starts) else len(content)
+        findings.extend(scan_line(content[start:end], index + 1, filepath))
 
     return findings
 
 
-def get_staged_files() -> list[Path]:
-    """Get list of staged files in git."""
-    result = subprocess.run(["git", "diff", "--cached", "--name-only", "--diff-filter=ACMR"], capture_output=True, text=True)
+def git_paths(args: list[str]) -> list[Path]:
+    """Run a git command with NUL-separated path output and return the paths."""
+    result = subprocess.run(["git", *args, "-z"], capture_output=True)
     if result.returncode != 0:
         return []
-    return [Path(f) for f in result.stdout.strip().split("\n") if f]
+    return [Path(os.fsdecode(f)) for f in result.stdout.split(b"\0") if f]
+
+
+def get_staged_files() -> list[Path]:
+    """Get list of staged files in git."""
+    return git_paths(["diff", "--cached", "--name-only", "--diff-filter=ACMR"])
 
 
 def get_commit_range_files(commit_range: str) -> list[Path]:
     """Get list of files changed in commit range."""
-    result = subprocess.run(["git", "diff", "--name-only", commit_range], capture_output=True, text=True)
-    if result.returncode != 0:
-        return []
-    return [Path(f) for f in result.stdout.strip().split("\n") if f]
+    return git_paths(["diff", "--name-only", commit_range])
 
 
 def get_all_tracked_files() -> list[Path]:
     """Get all tracked files in the repository."""
-    result = subprocess.run(["git", "ls-files"], capture_output=True, text=True)
-    if result.returncode != 0:
-        return []
-    return [Path(f) for f in result.stdout.strip().split("\n") if f]
+    return git_paths(["ls-files"])
 
 
 def format_github_annotation(finding: Finding) -> str:
@@ -457,11 +688,18 @@ def main() -> int:
 
     all_findings: list[Finding] = []
 
-    for filepath in files:
-        if not filepath.exists():
-            continue
-        findings = scan_file(filepath)
-        all_findings.extend(findings)
+    # Drop skipped paths before touching the filesystem at all. No exists()
+    # stat here: the open in scan_file already tells missing files apart.
+    files = [f for f in files if not should_skip_file(str(f))]
+    if len(files) >= PARALLEL_MIN_FILES:
+        # Regex scanning is CPU-bound; processes sidestep the GIL
+        workers = os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for findings in executor.map(scan_file, files, chunksize=max(1, len(files) // (4 * workers))):
+                all_findings.extend(findings)
+    else:
+        for filepath in files:
+            all_findings.extend(scan_file(filepath))
 
     # Sort by severity (high first), then by file
     severity_order = {"high": 0, "medium": 1, "low": 2}
@@ -469,27 +707,28 @@ def main() -> int:
 
     # Output results
     if all_findings:
+        # Build the whole report and write it once
         if args.github:
-            for finding in all_findings:
-                print(format_github_annotation(finding))
+            sys.stdout.write("".join(format_github_annotation(finding) + "\n" for finding in all_findings))
         else:
-            print(f"\n{'=' * 60}")
-            print(f"SECRETS SCAN RESULTS: {len(all_findings)} potential issue(s) found")
-            print(f"{'=' * 60}\n")
+            buf = io.StringIO()
+            buf.write(f"\n{'=' * 60}\n")
+            buf.write(f"SECRETS SCAN RESULTS: {len(all_findings)} potential issue(s) found\n")
+            buf.write(f"{'=' * 60}\n\n")
 
             for finding in all_findings:
                 severity_icon = {"high": "[HIGH]", "medium": "[MED]", "low": "[LOW]"}.get(finding.severity, "[?]")
-                print(f"{severity_icon} {finding.file}:{finding.line_number}")
-                print(f"       Pattern: {finding.pattern_name}")
-                print(f"       {finding.description}")
-                print(f"       Line: {finding.line_content}")
-                print()
+                buf.write(f"{severity_icon} {finding.file}:{finding.line_number}\n")
+                buf.write(f"       Pattern: {finding.pattern_name}\n")
+                buf.write(f"       {finding.description}\n")
+                buf.write(f"       Line: {finding.line_content}\n\n")
 
-            print(f"{'=' * 60}")
+            buf.write(f"{'=' * 60}\n")
             high_count = sum(1 for f in all_findings if f.severity == "high")
             med_count = sum(1 for f in all_findings if f.severity == "medium")
-            print(f"Summary: {high_count} high, {med_count} medium severity issues")
-            print(f"{'=' * 60}")
+            buf.write(f"Summary: {high_count} high, {med_count} medium severity issues\n")
+            buf.write(f"{'=' * 60}\n")
+            sys.stdout.write(buf.getvalue())
 
         # Return non-zero if high severity findings
         if any(f.severity == "high" for f in all_findings):
@@ -1,79 +1,67 @@
 #!/usr/bin/env python3
 """Analyze ffprobe outputs and identify missing format combinations."""
 
+import hashlib
+import json
+import os
 import re
+import sys
 from pathlib import Path
 from collections import defaultdict
 
+# Rows of the ffprobe listings, matched one line at a time over the whole
+# text; [^\S\n] is whitespace that does not run onto the next line. The
+# -formats/-codecs/-pix_fmts listings are only printed as text: -print_format
+# applies to probed files, and -show_pixel_formats lacks the I/O columns.
+_FMT_RE = re.compile(r'^[^\S\n]*([DE \t]{2})[^\S\n]+(\S+)[^\S\n]+(.+)', re.M)
+_CODEC_RE = re.compile(r'^[^\S\n]*([DEVAILS.]{6})[^\S\n]+(\S+)[^\S\n]+(.+)', re.M)
+_PIX_RE = re.compile(r'^[^\S\n]*([IO.]{5})[^\S\n]+(\S+)', re.M)
+
+def listing_body(file_path, separator):
+    """Return the rows of an ffprobe listing: the lines after its first separator line."""
+    text = Path(file_path).read_text()
+    match = re.search(rf'^[^\S\n]*{separator}.*$', text, re.M)
+    return text[match.end():] if match else ''
+
 # Parse ffprobe outputs
 def parse_formats(file_path):
     """Parse formats/muxers/demuxers."""
     formats = []
-    with open(file_path) as f:
-        lines = f.readlines()
-        started = False
-        for line in lines:
-            if line.strip().startswith('--'):
-                started = True
-                continue
-            if started and line.strip():
-                # Format: " D. matroska        Matroska / WebM"
-                match = re.match(r'\s*([DE\s]{2})\s+(\S+)\s+(.+)', line)
-                if match:
-                    flags, name, description = match.groups()
-                    formats.append({
-                        'name': name.strip(),
-                        'description': description.strip(),
-                        'demux': 'D' in flags,
-                        'mux': 'E' in flags
-                    })
+    # Format: " D. matroska        Matroska / WebM"
+    for flags, name, description in _FMT_RE.findall(listing_body(file_path, '--')):
+        formats.append({
+            'name': name,
+            'description': description.strip(),
+            'demux': 'D' in flags,
+            'mux': 'E' in flags
+        })
     return formats
 
 def parse_codecs(file_path):
     """Parse codecs."""
     codecs = []
-    with open(file_path) as f:
-        lines = f.readlines()
-        started = False
-        for line in lines:
-            if line.strip().startswith('------'):
-                started = True
-                continue
-            if started and line.strip():
-                # Format: " DEV.L. h264                 H.264 / AVC / MPEG-4 AVC / MPEG-4 part 10"
-                match = re.match(r'\s*([DEVAILS\.]{6})\s+(\S+)\s+(.+)', line)
-                if match:
-                    flags, name, description = match.groups()
-                    codec_type = 'video' if 'V' in flags else 'audio' if 'A' in flags else 'subtitle' if 'S' in flags else 'data'
-                    codecs.append({
-                        'name': name.strip(),
-                        'description': description.strip(),
-                        'type': codec_type,
-                        'decode': 'D' in flags,
-                        'encode': 'E' in flags
-                    })
+    # Format: " DEV.L. h264                 H.264 / AVC / MPEG-4 AVC / MPEG-4 part 10"
+    for flags, name, description in _CODEC_RE.findall(listing_body(file_path, '------')):
+        codec_type = 'video' if 'V' in flags else 'audio' if 'A' in flags else 'subtitle' if 'S' in flags else 'data'
+        codecs.append({
+            'name': name,
+            'description': description.strip(),
+            'type': codec_type,
+            'decode': 'D' in flags,
+            'encode': 'E' in flags
+        })
     return codecs
 
 def parse_pix_fmts(file_path):
     """Parse pixel formats."""
     pix_fmts = []
-    with open(file_path) as f:
-        lines = f.readlines()
-        started = False
-        for line in lines:
-            if line.strip().startswith('-----'):
-                started = True
-                continue
-            if started and line.strip():
-                # Format: "IO... yuv420p                3            12"
-                match = re.match(r'\s*([IO\.]{5})\s+(\S+)', line)
-                if match:
-                    flags, name = match.groups()
-                    pix_fmts.append({
-                        'name': name.strip(),
-                        'input': 'I' in flags,
-                        'output': 'O' in flags
-                    })
+    # Format: "IO... yuv420p                3            12"
+    for flags, name in _PIX_RE.findall(listing_body(file_path, '-----')):
+        pix_fmts.append({
+            'name': name,
+            'input': 'I' in flags,
+            'output': 'O' in flags
+        })
     return pix_fmts
 
 def parse_sample_fmts(file_path):
@@ -115,25 +103,28 @@ def get_tested_formats():
 
     samples_dir = Path('tests/samples/format_tests')
     if samples_dir.exists():
-        for f in samples_dir.glob('test_*'):
-            name = f.stem.replace('test_', '')
-
-            # Categorize by prefix
-            if name.startswith('container_'):
-                parts = name.replace('container_', '').split('_')
+        # Names only: scandir needs no per-file stat and builds no Path objects
+        with os.scandir(samples_dir) as it:
+            names = [os.path.splitext(entry.name)[0] for entry in it if entry.name.startswith('test_')]
+
+        for name in names:
+            # Categorize by prefix: test_<kind>_<rest>
+            kind, sep, rest = name.removeprefix('test_').partition('_')
+            if not sep:
+                continue
+            if kind == 'container':
+                parts = rest.split('_')
                 if len(parts) >= 2:
                     tested['containers'].add(parts[0])  # e.g., 'mp4', 'mkv'
                     tested['video_codecs'].add(parts[1])  # e.g., 'h264', 'hevc'
-            elif name.startswith('codec_'):
-                codec = name.replace('codec_', '')
-                tested['video_codecs'].add(codec.split('_')[0])
-            elif name.startswith('audio_'):
-                parts = name.replace('audio_', '').split('_')
-                tested['audio_codecs'].add(parts[0])
-            elif name.startswith('color_'):
-                tested['pixel_formats'].add(name.replace('color_', ''))
-            elif name.startswith('edge_'):
-                tested['edge_cases'].add(name.replace('edge_', ''))
+            elif kind == 'codec':
+                tested['video_codecs'].add(rest.split('_')[0])
+            elif kind == 'audio':
+                tested['audio_codecs'].add(rest.split('_')[0])
+            elif kind == 'color':
+                tested['pixel_formats'].add(rest)
+            elif kind == 'edge':
+                tested['edge_cases'].add(rest)
 
     return tested
 
@@ -147,227 +138,241 @@ layouts = parse_layouts('format_analysis/ffprobe_layouts.txt')
 
 tested = get_tested_formats()
 
+# Frozen once; the report only reads them
+tested_containers = frozenset(tested['containers'])
+tested_video = frozenset(tested['video_codecs'])
+tested_audio = frozenset(tested['audio_codecs'])
+tested_pix = frozenset(tested['pixel_formats'])
+
 # Categorize codecs
 video_codecs = [c for c in codecs if c['type'] == 'video' and c['encode']]
 audio_codecs = [c for c in codecs if c['type'] == 'audio' and c['encode']]
 subtitle_codecs = [c for c in codecs if c['type'] == 'subtitle']
 
-# Create markdown report
-md = []
-md.append("# Missing Format Combinations Analysis")
-md.append("")
-md.append("Comprehensive analysis of untested format combinations based on ffprobe capabilities.")
-md.append("")
-md.append("---")
-md.append("")
-
-# Summary statistics
-md.append("## Summary Statistics")
-md.append("")
-md.append("| Category | Total Available | Currently Tested | Missing |")
-md.append("|----------|-----------------|------------------|---------|")
-md.append(f"| **Container Formats** | {len([f for f in formats if f['mux']])} | {len(tested['containers'])} | {len([f for f in formats if f['mux']]) - len(tested['containers'])} |")
-md.append(f"| **Video Codecs** | {len(video_codecs)} | {len(tested['video_codecs'])} | {len(video_codecs) - len(tested['video_codecs'])} |")
-md.append(f"| **Audio Codecs** | {len(audio_codecs)} | {len(tested['audio_codecs'])} | {len(audio_codecs) - len(tested['audio_codecs'])} |")
-md.append(f"| **Pixel Formats** | {len([p for p in pix_fmts if p['output']])} | {len(tested['pixel_formats'])} | {len([p for p in pix_fmts if p['output']]) - len(tested['pixel_formats'])} |")
-md.append("")
-
-# Missing containers
-md.append("## Missing Container Formats")
-md.append("")
-md.append("Container formats that can be encoded but have not been tested:")
-md.append("")
-md.append("| Format | Description | Status |")
-md.append("|--------|-------------|--------|")
-
-missing_containers = []
-for fmt in formats:
-    if fmt['mux'] and fmt['name'] not in tested['containers']:
-        md.append(f"| `{fmt['name']}` | {fmt['description']} | ❌ Not tested |")
-        missing_containers.append(fmt['name'])
-
-if not missing_containers:
-    md.append("| — | No missing containers | ✅ Complete |")
-
-md.append("")
-md.append(f"**Total missing containers**: {len(missing_containers)}")
-md.append("")
-
-# Missing video codecs
-md.append("## Missing Video Codecs")
-md.append("")
-md.append("Video codecs that can be encoded but have not been tested:")
-md.append("")
-md.append("| Codec | Description | Status |")
-md.append("|-------|-------------|--------|")
-
-missing_video_codecs = []
-for codec in video_codecs:
-    # Simplify codec name for comparison
-    codec_simple = codec['name'].split('_')[0]
-    if codec_simple not in tested['video_codecs']:
-        md.append(f"| `{codec['name']}` | {codec['description']} | ❌ Not tested |")
-        missing_video_codecs.append(codec['name'])
-
-md.append("")
-md.append(f"**Total missing video codecs**: {len(missing_video_codecs)}")
-md.append("")
-
-# Missing audio codecs
-md.append("## Missing Audio Codecs")
-md.append("")
-md.append("Audio codecs that can be encoded but have not been tested:")
-md.append("")
-md.append("| Codec | Description | Status |")
-md.append("|-------|-------------|--------|")
-
-missing_audio_codecs = []
-for codec in audio_codecs:
-    codec_simple = codec['name'].split('_')[0]
-    if codec_simple not in tested['audio_codecs']:
-        md.append(f"| `{codec['name']}` | {codec['description']} | ❌ Not tested |")
-        missing_audio_codecs.append(codec['name'])
-
-md.append("")
-md.append(f"**Total missing audio codecs**: {len(missing_audio_codecs)}")
-md.append("")
-
-# Missing pixel formats
-md.append("## Missing Pixel Formats")
-md.append("")
-md.append("Showing first 50 untested pixel formats (many are esoteric):")
-md.append("")
-md.append("| Pixel Format | Status |")
-md.append("|--------------|--------|")
-
-missing_pix = []
-for pix in pix_fmts[:50]:  # Limit to 50 for readability
-    if pix['output'] and pix['name'] not in tested['pixel_formats']:
-        md.append(f"| `{pix['name']}` | ❌ Not tested |")
-        missing_pix.append(pix['name'])
-
-md.append("")
-md.append(f"**Total missing pixel formats**: {len([p for p in pix_fmts if p['output']])} (showing first 50)")
-md.append("")
-
-# RAW formats (special category)
-md.append("## RAW Camera Formats (Not in ffprobe)")
-md.append("")
-md.append("Camera RAW formats require special handling and cannot be generated with ffmpeg:")
-md.append("")
-md.append("| Brand | Extensions | Status |")
-md.append("|-------|------------|--------|")
-
-raw_formats = [
-    ("Canon", ".cr2, .cr3, .crw", "❌ Not tested"),
-    ("Nikon", ".nef, .nrw", "❌ Not tested"),
-    ("Sony", ".arw, .srf, .sr2", "❌ Not tested"),
-    ("Fujifilm", ".raf", "❌ Not tested"),
-    ("Olympus", ".orf", "❌ Not tested"),
-    ("Panasonic", ".rw2, .raw", "❌ Not tested"),
-    ("Pentax", ".pef, .ptx", "❌ Not tested"),
-    ("Leica", ".rwl, .dng", "❌ Not tested (DNG attempted)"),
-    ("Hasselblad", ".3fr, .fff", "❌ Not tested"),
-    ("Phase One", ".iiq", "❌ Not tested"),
-    ("Sigma", ".x3f", "❌ Not tested"),
-    ("Epson", ".erf", "❌ Not tested"),
-    ("Kodak", ".dcr, .kdc", "❌ Not tested"),
-    ("Minolta", ".mrw", "❌ Not tested"),
-    ("Samsung", ".srw", "❌ Not tested"),
-]
-
-for brand, exts, status in raw_formats:
-    md.append(f"| {brand} | {exts} | {status} |")
-
-md.append("")
-md.append("**Note**: RAW formats require actual camera files or specialized converters, cannot be generated synthetically.")
-md.append("")
-
-# Priority recommendations
-md.append("## Priority Testing Recommendations")
-md.append("")
-md.append("### High Priority (Common Formats)")
-md.append("")
-md.append("These are commonly used formats that should be tested:")
-md.append("")
-
-high_priority = []
-common_containers = ['mp4', 'mov', 'mkv', 'avi', 'webm', 'flv', 'wmv', 'mpg', 'mpeg', '3gp', 'm2ts', 'ts', 'mts', 'vob', 'f4v']
-common_video = ['h264', 'hevc', 'vp8', 'vp9', 'av1', 'mpeg4', 'mpeg2video', 'mpeg1video', 'mjpeg', 'msmpeg4v3', 'wmv2']
-common_audio = ['aac', 'mp3', 'ac3', 'eac3', 'flac', 'opus', 'vorbis', 'alac', 'pcm_s16le', 'pcm_s24le', 'dts', 'truehd']
-
-for container in common_containers:
-    if container not in tested['containers']:
-        high_priority.append(f"Container: `{container}`")
-
-for codec in common_video:
-    if codec not in tested['video_codecs']:
-        high_priority.append(f"Video codec: `{codec}`")
-
-for codec in common_audio:
-    if codec not in tested['audio_codecs']:
-        high_priority.append(f"Audio codec: `{codec}`")
-
-for item in high_priority[:20]:  # Show top 20
-    md.append(f"- {item}")
-
-if not high_priority:
-    md.append("- ✅ All high-priority formats have been tested!")
-
-md.append("")
-
-# Exotic/professional formats
-md.append("### Medium Priority (Professional/Broadcast)")
-md.append("")
-professional = ['mxf', 'gxf', 'lxf', 'dnxhd', 'prores', 'ffv1', 'huffyuv', 'utvideo', 'cineform']
-md.append("Professional and broadcast formats:")
-md.append("")
-for fmt in professional:
-    status = "✅ Tested" if fmt in tested['containers'] or fmt in tested['video_codecs'] else "❌ Not tested"
-    md.append(f"- `{fmt}`: {status}")
-
-md.append("")
-
-# Full lists
-md.append("## Complete Available Formats")
-md.append("")
-md.append(f"### All Muxable Containers ({len([f for f in formats if f['mux']])} total)")
-md.append("")
-md.append("| Format | Description |")
-md.append("|--------|-------------|")
-for fmt in sorted([f for f in formats if f['mux']], key=lambda x: x['name']):
-    tested_mark = "✅" if fmt['name'] in tested['containers'] else "❌"
-    md.append(f"| {tested_mark} `{fmt['name']}` | {fmt['description']} |")
-
-md.append("")
-md.append(f"### All Encodable Video Codecs ({len(video_codecs)} total)")
-md.append("")
-md.append("| Codec | Description |")
-md.append("|-------|-------------|")
-for codec in sorted(video_codecs, key=lambda x: x['name']):
-    codec_simple = codec['name'].split('_')[0]
-    tested_mark = "✅" if codec_simple in tested['video_codecs'] else "❌"
-    md.append(f"| {tested_mark} `{codec['name']}` | {codec['description']} |")
-
-md.append("")
-md.append(f"### All Encodable Audio Codecs ({len(audio_codecs)} total)")
-md.append("")
-md.append("| Codec | Description |")
-md.append("|-------|-------------|")
-for codec in sorted(audio_codecs, key=lambda x: x['name']):
-    codec_simple = codec['name'].split('_')[0]
-    tested_mark = "✅" if codec_simple in tested['audio_codecs'] else "❌"
-    md.append(f"| {tested_mark} `{codec['name']}` | {codec['description']} |")
-
-md.append("")
-md.append("---")
-md.append("")
-md.append("*Generated by analyze_missing_formats.py*")
-
-# Write output
+# The report is a function of the parsed listings, the tested sets and this
+# script; when none changed since the last run the existing one is kept
 output_file = Path('MISSING_FORMATS.md')
-with open(output_file, 'w') as f:
-    f.write('\n'.join(md))
+cache_file = Path('format_analysis/.analyze_missing_formats.cache')
+report_hash = hashlib.blake2b(json.dumps([
+    formats, codecs, pix_fmts,
+    sorted(tested_containers), sorted(tested_video), sorted(tested_audio), sorted(tested_pix),
+    Path(__file__).read_text(),
+]).encode()).hexdigest()
+try:
+    up_to_date = output_file.exists() and cache_file.read_text() == report_hash
+except FileNotFoundError:
+    up_to_date = False
+if up_to_date:
+    print(f"✅ {output_file} is up to date")
+    sys.exit(0)
+
+# Write the markdown report straight to the file through a 64 KB buffer
+with open(output_file, 'w', buffering=1 << 16) as out:
+    w = out.write
+
+    w("# Missing Format Combinations Analysis\n")
+    w("\n")
+    w("Comprehensive analysis of untested format combinations based on ffprobe capabilities.\n")
+    w("\n")
+    w("---\n")
+    w("\n")
+
+    # Summary statistics
+    w("## Summary Statistics\n")
+    w("\n")
+    w("| Category | Total Available | Currently Tested | Missing |\n")
+    w("|----------|-----------------|------------------|---------|\n")
+    w(f"| **Container Formats** | {len([f for f in formats if f['mux']])} | {len(tested_containers)} | {len([f for f in formats if f['mux']]) - len(tested_containers)} |\n")
+    w(f"| **Video Codecs** | {len(video_codecs)} | {len(tested_video)} | {len(video_codecs) - len(tested_video)} |\n")
+    w(f"| **Audio Codecs** | {len(audio_codecs)} | {len(tested_audio)} | {len(audio_codecs) - len(tested_audio)} |\n")
+    w(f"| **Pixel Formats** | {len([p for p in pix_fmts if p['output']])} | {len(tested_pix)} | {len([p for p in pix_fmts if p['output']]) - len(tested_pix)} |\n")
+    w("\n")
+
+    # Missing containers
+    w("## Missing Container Formats\n")
+    w("\n")
+    w("Container formats that can be encoded but have not been tested:\n")
+    w("\n")
+    w("| Format | Description | Status |\n")
+    w("|--------|-------------|--------|\n")
+
+    muxable = {fmt['name']: fmt for fmt in formats if fmt['mux']}
+    missing_containers = sorted(muxable.keys() - tested_containers)
+    for name in missing_containers:
+        w(f"| `{name}` | {muxable[name]['description']} | ❌ Not tested |\n")
+
+    if not missing_containers:
+        w("| — | No missing containers | ✅ Complete |\n")
+
+    w("\n")
+    w(f"**Total missing containers**: {len(missing_containers)}\n")
+    w("\n")
+
+    # Missing video codecs
+    w("## Missing Video Codecs\n")
+    w("\n")
+    w("Video codecs that can be encoded but have not been tested:\n")
+    w("\n")
+    w("| Codec | Description | Status |\n")
+    w("|-------|-------------|--------|\n")
+
+    # Codecs are compared by their simplified name, e.g. h264_nvenc as h264
+    video_by_name = {codec['name']: codec for codec in video_codecs}
+    untested_video = {name.split('_')[0] for name in video_by_name} - tested_video
+    missing_video_codecs = sorted(name for name in video_by_name if name.split('_')[0] in untested_video)
+    for name in missing_video_codecs:
+        w(f"| `{name}` | {video_by_name[name]['description']} | ❌ Not tested |\n")
+
+    w("\n")
+    w(f"**Total missing video codecs**: {len(missing_video_codecs)}\n")
+    w("\n")
+
+    # Missing audio codecs
+    w("## Missing Audio Codecs\n")
+    w("\n")
+    w("Audio codecs that can be encoded but have not been tested:\n")
+    w("\n")
+    w("| Codec | Description | Status |\n")
+    w("|-------|-------------|--------|\n")
+
+    audio_by_name = {codec['name']: codec for codec in audio_codecs}
+    untested_audio = {name.split('_')[0] for name in audio_by_name} - tested_audio
+    missing_audio_codecs = sorted(name for name in audio_by_name if name.split('_')[0] in untested_audio)
+    for name in missing_audio_codecs:
+        w(f"| `{name}` | {audio_by_name[name]['description']} | ❌ Not tested |\n")
+
+    w("\n")
+    w(f"**Total missing audio codecs**: {len(missing_audio_codecs)}\n")
+    w("\n")
+
+    # Missing pixel formats
+    w("## Missing Pixel Formats\n")
+    w("\n")
+    w("Showing first 50 untested pixel formats (many are esoteric):\n")
+    w("\n")
+    w("| Pixel Format | Status |\n")
+    w("|--------------|--------|\n")
+
+    # Limit to the first 50 listed for readability
+    missing_pix = sorted({pix['name'] for pix in pix_fmts[:50] if pix['output']} - tested_pix)
+    for name in missing_pix:
+        w(f"| `{name}` | ❌ Not tested |\n")
+
+    w("\n")
+    w(f"**Total missing pixel formats**: {len([p for p in pix_fmts if p['output']])} (showing first 50)\n")
+    w("\n")
+
+    # RAW formats (special category)
+    w("## RAW Camera Formats (Not in ffprobe)\n")
+    w("\n")
+    w("Camera RAW formats require special handling and cannot be generated with ffmpeg:\n")
+    w("\n")
+    w("| Brand | Extensions | Status |\n")
+    w("|-------|------------|--------|\n")
+
+    raw_formats = [
+        ("Canon", ".cr2, .cr3, .crw", "❌ Not tested"),
+        ("Nikon", ".nef, .nrw", "❌ Not tested"),
+        ("Sony", ".arw, .srf, .sr2", "❌ Not tested"),
+        ("Fujifilm", ".raf", "❌ Not tested"),
+        ("Olympus", ".orf", "❌ Not tested"),
+        ("Panasonic", ".rw2, .raw", "❌ Not tested"),
+        ("Pentax", ".pef, .ptx", "❌ Not tested"),
+        ("Leica", ".rwl, .dng", "❌ Not tested (DNG attempted)"),
+        ("Hasselblad", ".3fr, .fff", "❌ Not tested"),
+        ("Phase One", ".iiq", "❌ Not tested"),
+        ("Sigma", ".x3f", "❌ Not tested"),
+        ("Epson", ".erf", "❌ Not tested"),
+        ("Kodak", ".dcr, .kdc", "❌ Not tested"),
+        ("Minolta", ".mrw", "❌ Not tested"),
+        ("Samsung", ".srw", "❌ Not tested"),
+    ]
+
+    for brand, exts, status in raw_formats:
+        w(f"| {brand} | {exts} | {status} |\n")
+
+    w("\n")
+    w("**Note**: RAW formats require actual camera files or specialized converters, cannot be generated synthetically.\n")
+    w("\n")
+
+    # Priority recommendations
+    w("## Priority Testing Recommendations\n")
+    w("\n")
+    w("### High Priority (Common Formats)\n")
+    w("\n")
+    w("These are commonly used formats that should be tested:\n")
+    w("\n")
+
+    common_containers = ['mp4', 'mov', 'mkv', 'avi', 'webm', 'flv', 'wmv', 'mpg', 'mpeg', '3gp', 'm2ts', 'ts', 'mts', 'vob', 'f4v']
+    common_video = ['h264', 'hevc', 'vp8', 'vp9', 'av1', 'mpeg4', 'mpeg2video', 'mpeg1video', 'mjpeg', 'msmpeg4v3', 'wmv2']
+    common_audio = ['aac', 'mp3', 'ac3', 'eac3', 'flac', 'opus', 'vorbis', 'alac', 'pcm_s16le', 'pcm_s24le', 'dts', 'truehd']
+
+    high_priority = (
+        [f"Container: `{container}`" for container in common_containers if container not in tested_containers]
+        + [f"Video codec: `{codec}`" for codec in common_video if codec not in tested_video]
+        + [f"Audio codec: `{codec}`" for codec in common_audio if codec not in tested_audio]
+    )
+
+    for item in high_priority[:20]:  # Show top 20
+        w(f"- {item}\n")
+
+    if not high_priority:
+        w("- ✅ All high-priority formats have been tested!\n")
+
+    w("\n")
+
+    # Exotic/professional formats
+    w("### Medium Priority (Professional/Broadcast)\n")
+    w("\n")
+    professional = ['mxf', 'gxf', 'lxf', 'dnxhd', 'prores', 'ffv1', 'huffyuv', 'utvideo', 'cineform']
+    w("Professional and broadcast formats:\n")
+    w("\n")
+    tested_containers_or_video = tested_containers | tested_video
+    for fmt in professional:
+        status = "✅ Tested" if fmt in tested_containers_or_video else "❌ Not tested"
+        w(f"- `{fmt}`: {status}\n")
+
+    w("\n")
+
+    # Full lists
+    w("## Complete Available Formats\n")
+    w("\n")
+    w(f"### All Muxable Containers ({len([f for f in formats if f['mux']])} total)\n")
+    w("\n")
+    w("| Format | Description |\n")
+    w("|--------|-------------|\n")
+    # Each table is built with one join and handed to a single write
+    w(''.join(
+        f"| {'✅' if fmt['name'] in tested_containers else '❌'} `{fmt['name']}` | {fmt['description']} |\n"
+        for fmt in sorted([f for f in formats if f['mux']], key=lambda x: x['name'])
+    ))
+
+    w("\n")
+    w(f"### All Encodable Video Codecs ({len(video_codecs)} total)\n")
+    w("\n")
+    w("| Codec | Description |\n")
+    w("|-------|-------------|\n")
+    w(''.join(
+        f"| {'✅' if codec['name'].split('_')[0] in tested_video else '❌'} `{codec['name']}` | {codec['description']} |\n"
+        for codec in sorted(video_codecs, key=lambda x: x['name'])
+    ))
+
+    w("\n")
+    w(f"### All Encodable Audio Codecs ({len(audio_codecs)} total)\n")
+    w("\n")
+    w("| Codec | Description |\n")
+    w("|-------|-------------|\n")
+    w(''.join(
+        f"| {'✅' if codec['name'].split('_')[0] in tested_audio else '❌'} `{codec['name']}` | {codec['description']} |\n"
+        for codec in sorted(audio_codecs, key=lambda x: x['name'])
+    ))
+
+    w("\n")
+    w("---\n")
+    w("\n")
+    w("*Generated by analyze_missing_formats.py*")
+
+cache_file.write_text(report_hash)
 
 print(f"✅ Created {output_file}")
 print(f"\nSummary:")
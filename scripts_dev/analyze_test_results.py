@@ -6,55 +6,83 @@ import re
 from pathlib import Path
 from collections import defaultdict
 
-# Load results
+try:
+    import ijson
+except ImportError:  # optional: stream results instead of loading them whole
+    ijson = None
+
+try:
+    import orjson
+except ImportError:  # optional: faster JSON serialization
+    orjson = None
+
+# Summary counts: the first number after each label on the same line,
+# compiled once instead of per result
+_RE_IMPORTED = re.compile(r"Total imported:[^\d\n]*(\d+)")
+_RE_COMPAT = re.compile(r"Compatible \(no conversion\):[^\d\n]*(\d+)")
+_RE_REFUSED = re.compile(r"Refused by Apple Photos:[^\d\n]*(\d+)")
+
 RESULTS_FILE = Path("format_tests_results/test_results.json")
-with open(RESULTS_FILE) as f:
-    results = json.load(f)
+# Corrected import flags per file; test_results.json itself is left as written
+PARSED_FILE = Path("format_tests_results/test_results.parsed.json")
+
+
+def iter_results():
+    """Yield the test results one by one.
+
+    With ijson only one result, stdout included, is in memory at a time;
+    otherwise the whole file is loaded first.
+    """
+    if ijson is not None:
+        with open(RESULTS_FILE, "rb") as f:
+            yield from ijson.items(f, "item")
+    elif orjson is not None:
+        yield from orjson.loads(RESULTS_FILE.read_bytes())
+    else:
+        with open(RESULTS_FILE) as f:
+            yield from json.load(f)
+
 
-# Parse each result
+# Parse each result, grouping by category and tallying as we go
 compatibility_data = []
+parsed = {}
+by_category = defaultdict(list)
+imported_by_category = defaultdict(int)
+total_imported = total_compatible = total_refused = 0
 
-for result in results:
+for result in iter_results():
     filename = result["file"]
-    stdout = result["stdout"]
+    # test_all_samples.py keeps only the tail of stdout; older runs kept all of it
+    stdout = result.get("stdout_tail", result.get("stdout", ""))
 
     # Determine if imported by parsing output
     imported = False
     compatible = False
     refused = False
 
-    # Look for import statistics - handle ANSI codes and variable spacing
-    if "Total imported:" in stdout:
-        # Extract number after "Total imported:" - handle ANSI escape sequences and spaces
-        match = re.search(r"Total imported:.*?(\d+)", stdout)
-        if match:
-            total_imported = int(match.group(1))
-            imported = total_imported > 0
-
-    # Check if marked as compatible - handle ANSI codes
-    if "Compatible (no conversion):" in stdout:
-        match = re.search(r"Compatible \(no conversion\):.*?(\d+)", stdout)
-        if match:
-            compatible_count = int(match.group(1))
-            compatible = compatible_count > 0
-
-    # Check if refused - handle ANSI codes
-    if "Refused by Apple Photos:" in stdout:
-        match = re.search(r"Refused by Apple Photos:.*?(\d+)", stdout)
-        if match:
-            refused_count = int(match.group(1))
-            refused = refused_count > 0
+    # Look for import statistics
+    match = _RE_IMPORTED.search(stdout)
+    if match:
+        imported = int(match[1]) > 0
+
+    # Check if marked as compatible
+    match = _RE_COMPAT.search(stdout)
+    if match:
+        compatible = int(match[1]) > 0
+
+    # Check if refused
+    match = _RE_REFUSED.search(stdout)
+    if match:
+        refused = int(match[1]) > 0
 
     # Parse filename to extract format info
     parts = filename.replace("test_", "").split("_")
     category = parts[0] if parts else "unknown"
 
-    # Update the result dict with corrected parsing
-    result["imported"] = imported
-    result["compatible"] = compatible
-    result["refused"] = refused
+    # Record the corrected parsing
+    parsed[filename] = {"imported": imported, "compatible": compatible, "refused": refused}
 
-    compatibility_data.append({
+    item = {
         "file": filename,
         "extension": result["extension"],
         "category": category,
@@ -62,12 +90,15 @@ for result in results:
         "compatible": compatible,
         "refused": refused,
         "size": result["size"],
-    })
+    }
+    compatibility_data.append(item)
+    by_category[category].append(item)
 
-# Group by category
-by_category = defaultdict(list)
-for item in compatibility_data:
-    by_category[item["category"]].append(item)
+    # Booleans add as 0/1
+    imported_by_category[category] += imported
+    total_imported += imported
+    total_compatible += compatible
+    total_refused += refused
 
 # Print summary
 print("=" * 80)
@@ -76,9 +107,6 @@ print("=" * 80)
 print()
 
 total_tested = len(compatibility_data)
-total_imported = sum(1 for item in compatibility_data if item["imported"])
-total_compatible = sum(1 for item in compatibility_data if item["compatible"])
-total_refused = sum(1 for item in compatibility_data if item["refused"])
 
 print(f"Total files tested:      {total_tested}")
 print(f"Successfully imported:   {total_imported} ({total_imported/total_tested*100:.1f}%)")
@@ -88,9 +116,7 @@ print()
 
 # Print by category
 for category in sorted(by_category.keys()):
-    items = by_category[category]
-    imported_count = sum(1 for item in items if item["imported"])
-    print(f"{category.upper()}: {imported_count}/{len(items)} imported")
+    print(f"{category.upper()}: {imported_by_category[category]}/{len(by_category[category])} imported")
 
 print()
 print("=" * 80)
@@ -111,7 +137,7 @@ for item in sorted(compatibility_data, key=lambda x: (x["category"], x["file"]))
 
 # Save summary
 summary_file = Path("format_tests_results/compatibility_summary.txt")
-with open(summary_file, "w") as f:
+with open(summary_file, "w", buffering=1 << 16) as f:
     f.write("FORMAT COMPATIBILITY TEST RESULTS\n")
     f.write("=" * 80 + "\n\n")
     f.write(f"Total files tested:      {total_tested}\n")
@@ -120,14 +146,14 @@ with open(summary_file, "w") as f:
     f.write(f"Refused by Photos:       {total_refused} ({total_refused/total_tested*100:.1f}%)\n\n")
 
     for category in sorted(by_category.keys()):
-        items = by_category[category]
-        imported_count = sum(1 for item in items if item["imported"])
-        f.write(f"{category.upper()}: {imported_count}/{len(items)} imported\n")
+        f.write(f"{category.upper()}: {imported_by_category[category]}/{len(by_category[category])} imported\n")
 
-# Save corrected results back to JSON
-with open(RESULTS_FILE, "w") as f:
-    json.dump(results, f, indent=2)
+# Save the corrected flags next to the results instead of rewriting them
+if orjson is not None:
+    PARSED_FILE.write_bytes(orjson.dumps(parsed))
+else:
+    PARSED_FILE.write_text(json.dumps(parsed))
 
 print()
-print(f"Updated test results saved to: {RESULTS_FILE}")
+print(f"Parsed import flags saved to: {PARSED_FILE}")
 print(f"Summary saved to: {summary_file}")
@@ -11,11 +11,15 @@ This script:
 """
 
 import json
+import os
+import re
+import shutil
 import subprocess
 import sys
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import time
 
 # Import the command generator
@@ -26,6 +30,100 @@ from generate_all_format_commands import (
     save_commands_to_file
 )
 
+
+def _start_script(script: str) -> subprocess.Popen:
+    """Start `uv run python3 <script>` in the current directory.
+
+    uv is given by absolute path and file descriptors are inherited (Python
+    opens its own as non-inheritable anyway), which lets subprocess start it
+    with posix_spawn rather than fork + exec.
+    """
+    uv = shutil.which('uv') or 'uv'
+    return subprocess.Popen([uv, 'run', 'python3', script], close_fds=False)
+
+
+def _test_one_sample(test_file: Path, results_dir: Path) -> Dict:
+    """Test one sample with Smart Media Manager and save its log."""
+    result = {
+        'file': test_file.name,
+        'size': test_file.stat().st_size,
+        'extension': test_file.suffix,
+        'timestamp': datetime.now().isoformat(),
+    }
+
+    # Run smart-media-manager
+    cmd = [
+        'uv', 'run', 'smart-media-manager',
+        str(test_file),
+        '--file',
+        '--skip-renaming',
+        '--skip-convert',
+        '--skip-compatibility-check',
+    ]
+
+    try:
+        proc = subprocess.run(
+            cmd,
+            capture_output=True,
+            text=True,
+            timeout=180
+        )
+
+        result['exit_code'] = proc.returncode
+        result['stdout'] = proc.stdout
+        result['stderr'] = proc.stderr
+
+        # Parse import status
+        imported = False
+        compatible = False
+        refused = False
+
+        stdout = proc.stdout
+
+        # Extract statistics
+        if 'Total imported:' in stdout:
+            match = re.search(r'Total imported:.*?(\d+)', stdout)
+            if match:
+                total_imported = int(match.group(1))
+                imported = total_imported > 0
+
+        if 'Compatible (no conversion):' in stdout:
+            match = re.search(r'Compatible \(no conversion\):.*?(\d+)', stdout)
+            if match:
+                compatible_count = int(match.group(1))
+                compatible = compatible_count > 0
+
+        if 'Refused by Apple Photos:' in stdout:
+            match = re.search(r'Refused by Apple Photos:.*?(\d+)', stdout)
+            if match:
+                refused_count = int(match.group(1))
+                refused = refused_count > 0
+
+        result['imported'] = imported
+        result['compatible'] = compatible
+        result['refused'] = refused
+
+        # Save individual log
+        log_file = results_dir / f"{test_file.stem}.log"
+        with open(log_file, 'w') as f:
+            f.write(f"Test file: {test_file}\n")
+            f.write(f"Command: {' '.join(cmd)}\n")
+            f.write(f"\n=== STDOUT ===\n{proc.stdout}\n")
+            f.write(f"\n=== STDERR ===\n{proc.stderr}\n")
+            f.write(f"\n=== EXIT CODE ===\n{proc.returncode}\n")
+
+        result['log_file'] = str(log_file)
+
+    except subprocess.TimeoutExpired:
+        result['error'] = 'timeout'
+        result['imported'] = False
+    except Exception as e:
+        result['error'] = str(e)
+        result['imported'] = False
+
+    return result
+
+
 class ComprehensiveFormatTester:
     def __init__(self, base_video: str, base_image: str, output_dir: str, results_dir: str):
         self.base_video = Path(base_video)
@@ -149,103 +247,35 @@ class ComprehensiveFormatTester:
         test_files = sorted(self.output_dir.glob('test_*'))
         print(f"\nFound {len(test_files)} test samples")
 
-        for i, test_file in enumerate(test_files, 1):
-            print(f"\n[{i}/{len(test_files)}] Testing: {test_file.name}")
-
-            result = {
-                'file': test_file.name,
-                'size': test_file.stat().st_size,
-                'extension': test_file.suffix,
-                'timestamp': datetime.now().isoformat(),
+        # Each test blocks in its smart-media-manager child, so threads are
+        # enough to keep one sample per core in flight. Progress is reported
+        # as tests finish; results are stored in sample order.
+        results = [None] * len(test_files)
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            future_to_idx = {
+                executor.submit(_test_one_sample, test_file, self.results_dir): idx
+                for idx, test_file in enumerate(test_files)
             }
-
-            # Run smart-media-manager
-            cmd = [
-                'uv', 'run', 'smart-media-manager',
-                str(test_file),
-                '--file',
-                '--skip-renaming',
-                '--skip-convert',
-                '--skip-compatibility-check',
-            ]
-
-            try:
-                proc = subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    text=True,
-                    timeout=180
-                )
-
-                result['exit_code'] = proc.returncode
-                result['stdout'] = proc.stdout
-                result['stderr'] = proc.stderr
-
-                # Parse import status
-                imported = False
-                compatible = False
-                refused = False
-
-                stdout = proc.stdout
-
-                # Extract statistics
-                if 'Total imported:' in stdout:
-                    import re
-                    match = re.search(r'Total imported:.*?(\d+)', stdout)
-                    if match:
-                        total_imported = int(match.group(1))
-                        imported = total_imported > 0
-
-                if 'Compatible (no conversion):' in stdout:
-                    match = re.search(r'Compatible \(no conversion\):.*?(\d+)', stdout)
-                    if match:
-                        compatible_count = int(match.group(1))
-                        compatible = compatible_count > 0
-
-                if 'Refused by Apple Photos:' in stdout:
-                    match = re.search(r'Refused by Apple Photos:.*?(\d+)', stdout)
-                    if match:
-                        refused_count = int(match.group(1))
-                        refused = refused_count > 0
-
-                result['imported'] = imported
-                result['compatible'] = compatible
-                result['refused'] = refused
-
-                # Save individual log
-                log_file = self.results_dir / f"{test_file.stem}.log"
-                with open(log_file, 'w') as f:
-                    f.write(f"Test file: {test_file}\n")
-                    f.write(f"Command: {' '.join(cmd)}\n")
-                    f.write(f"\n=== STDOUT ===\n{proc.stdout}\n")
-                    f.write(f"\n=== STDERR ===\n{proc.stderr}\n")
-                    f.write(f"\n=== EXIT CODE ===\n{proc.returncode}\n")
-
-                result['log_file'] = str(log_file)
+            for i, future in enumerate(as_completed(future_to_idx), 1):
+                result = results[future_to_idx[future]] = future.result()
+                print(f"\n[{i}/{len(test_files)}] Testing: {result['file']}")
 
                 # Update stats
-                self.stats['tested'] += 1
-                if imported:
-                    self.stats['imported'] += 1
-                    print(f"           ✅ IMPORTED")
-                elif proc.returncode == 0:
-                    print(f"           ⚠️  Processed but not imported")
-                else:
+                if 'error' in result:
                     self.stats['failed'] += 1
-                    print(f"           ❌ FAILED (exit code {proc.returncode})")
-
-            except subprocess.TimeoutExpired:
-                result['error'] = 'timeout'
-                result['imported'] = False
-                self.stats['failed'] += 1
-                print(f"           ⏱️  TIMEOUT")
-            except Exception as e:
-                result['error'] = str(e)
-                result['imported'] = False
-                self.stats['failed'] += 1
-                print(f"           ❌ ERROR: {e}")
-
-            self.results.append(result)
+                    print("           ⏱️  TIMEOUT" if result['error'] == 'timeout' else f"           ❌ ERROR: {result['error']}")
+                else:
+                    self.stats['tested'] += 1
+                    if result['imported']:
+                        self.stats['imported'] += 1
+                        print(f"           ✅ IMPORTED")
+                    elif result['exit_code'] == 0:
+                        print(f"           ⚠️  Processed but not imported")
+                    else:
+                        self.stats['failed'] += 1
+                        print(f"           ❌ FAILED (exit code {result['exit_code']})")
+
+        self.results.extend(results)
 
         # Save results
         with open(self.results_file, 'w') as f:
@@ -269,17 +299,20 @@ class ComprehensiveFormatTester:
                 self.results = json.load(f)
 
         # Run analysis scripts
+        # The missing formats analysis only reads ffprobe output and the
+        # sample names, so it runs alongside the other two. The compatibility
+        # sheet reads the import flags analyze_test_results.py writes to
+        # test_results.parsed.json, so it waits for that script.
+        print("\nGenerating missing formats analysis...")
+        missing_formats = _start_script('scripts/analyze_missing_formats.py')
+
         print("\nRunning analysis...")
-        subprocess.run(['uv', 'run', 'python3', 'scripts/analyze_test_results.py'],
-                      cwd=Path.cwd())
+        _start_script('scripts/analyze_test_results.py').wait()
 
         print("\nGenerating compatibility sheet...")
-        subprocess.run(['uv', 'run', 'python3', 'scripts/create_compatibility_sheet.py'],
-                      cwd=Path.cwd())
+        _start_script('scripts/create_compatibility_sheet.py').wait()
 
-        print("\nGenerating missing formats analysis...")
-        subprocess.run(['uv', 'run', 'python3', 'scripts/analyze_missing_formats.py'],
-                      cwd=Path.cwd())
+        missing_formats.wait()
 
         print("\n✅ Reports generated:")
         print("   - COMPATIBILITY_SHEET.md")
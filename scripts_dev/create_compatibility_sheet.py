@@ -5,153 +5,175 @@ import json
 from pathlib import Path
 from collections import defaultdict
 
+try:
+    import orjson
+except ImportError:  # optional: faster JSON serialization
+    orjson = None
+
 # Load results
 RESULTS_FILE = Path("format_tests_results/test_results.json")
 with open(RESULTS_FILE) as f:
     results = json.load(f)
 
-# Group by category
+# Import flags as corrected by analyze_test_results.py, keyed by file; results
+# it has not parsed keep the flags recorded at test time
+PARSED_FILE = Path("format_tests_results/test_results.parsed.json")
+try:
+    parsed = json.loads(PARSED_FILE.read_bytes())
+except FileNotFoundError:
+    parsed = {}
+
+# Unpack into parallel columns once; everything below indexes these lists
+files = [r["file"] for r in results]
+extensions = [r["extension"] for r in results]
+sizes = [r["size"] for r in results]
+flags = [parsed.get(r["file"], r) for r in results]
+imported = [bool(f.get("imported")) for f in flags]
+compatible = [bool(f.get("compatible")) for f in flags]
+refused = [bool(f.get("refused")) for f in flags]
+del results, flags
+
+# Group row indices by category and aggregate per-category counts in one pass
 by_category = defaultdict(list)
-for result in results:
+stats = defaultdict(lambda: {"total": 0, "imported": 0, "compatible": 0, "refused": 0})
+for i, filename in enumerate(files):
     # Parse filename to extract format info
-    filename = result["file"]
     parts = filename.replace("test_", "").split("_")
     category = parts[0] if parts else "unknown"
-    by_category[category].append(result)
-
-# Calculate stats
-total_tested = len(results)
-imported = [r for r in results if r.get("imported")]
-compatible = [r for r in results if r.get("compatible")]
-refused = [r for r in results if r.get("refused")]
-
-# Create markdown document
-md = []
-md.append("# Apple Photos Format Compatibility Matrix")
-md.append("")
-md.append("Comprehensive test results for media format compatibility with Apple Photos.")
-md.append("")
-md.append("## Test Configuration")
-md.append("")
-md.append("- **Tool**: Smart Media Manager")
-md.append("- **Test Mode**: Direct import, no conversion")
-md.append("- **Flags**: `--file --skip-renaming --skip-convert --skip-compatibility-check`")
-md.append("- **Total Samples**: " + str(total_tested))
-md.append("")
-md.append("## Overall Results")
-md.append("")
-md.append(f"| Metric | Count | Percentage |")
-md.append(f"|--------|-------|------------|")
-md.append(f"| **Total files tested** | {total_tested} | 100.0% |")
-md.append(f"| **Successfully imported** | {len(imported)} | {len(imported)/total_tested*100:.1f}% |")
-md.append(f"| **Marked as compatible** | {len(compatible)} | {len(compatible)/total_tested*100:.1f}% |")
-md.append(f"| **Refused by Apple Photos** | {len(refused)} | {len(refused)/total_tested*100:.1f}% |")
-md.append("")
-
-# Category summary
-md.append("## Results by Category")
-md.append("")
-md.append("| Category | Imported | Total | Success Rate |")
-md.append("|----------|----------|-------|--------------|")
-for category in sorted(by_category.keys()):
-    items = by_category[category]
-    imported_count = sum(1 for item in items if item.get("imported"))
-    success_rate = imported_count / len(items) * 100 if items else 0
-    md.append(f"| {category.upper()} | {imported_count} | {len(items)} | {success_rate:.1f}% |")
-md.append("")
-
-# Detailed results by category
-md.append("## Detailed Results by Category")
-md.append("")
+    by_category[category].append(i)
+    s = stats[category]
+    s["total"] += 1
+    s["imported"] += imported[i]
+    s["compatible"] += compatible[i]
+    s["refused"] += refused[i]
 
-for category in sorted(by_category.keys()):
-    items = by_category[category]
-    md.append(f"### {category.upper()}")
-    md.append("")
-    md.append("| File | Extension | Imported | Compatible | Refused |")
-    md.append("|------|-----------|----------|------------|---------|")
-
-    for item in sorted(items, key=lambda x: x["file"]):
-        imported_icon = "✅" if item.get("imported") else "❌"
-        compatible_icon = "✅" if item.get("compatible") else "⚠️"
-        refused_icon = "❌" if item.get("refused") else "✅"
-
-        md.append(f"| {item['file']} | {item['extension']} | {imported_icon} | {compatible_icon} | {refused_icon} |")
-    md.append("")
-
-# Format recommendations
-md.append("## Format Recommendations")
-md.append("")
-md.append("### ✅ Highly Compatible Formats")
-md.append("")
-md.append("Based on test results, the following formats show excellent compatibility:")
-md.append("")
-
-# Find formats with 100% success rate
-success_formats = []
-for category in sorted(by_category.keys()):
-    items = by_category[category]
-    imported_count = sum(1 for item in items if item.get("imported"))
-    if imported_count == len(items) and len(items) > 0:
-        success_formats.append((category, items))
-
-if success_formats:
-    for category, items in success_formats:
-        extensions = set(item["extension"] for item in items)
-        md.append(f"- **{category.upper()}**: {', '.join(sorted(extensions))}")
-else:
-    md.append("- No formats achieved 100% import success rate")
+for s in stats.values():
+    s["success_rate"] = s["imported"] / s["total"] * 100
 
-md.append("")
-md.append("### ⚠️ Problematic Formats")
-md.append("")
-md.append("The following formats showed compatibility issues:")
-md.append("")
+# Calculate stats
+total_tested = len(files)
+imported_total = imported.count(True)
+compatible_total = compatible.count(True)
+refused_total = refused.count(True)
 
-# Find formats with <50% success rate
-problem_formats = []
-for category in sorted(by_category.keys()):
-    items = by_category[category]
-    imported_count = sum(1 for item in items if item.get("imported"))
-    success_rate = imported_count / len(items) * 100 if items else 0
-    if success_rate < 50:
-        problem_formats.append((category, items, success_rate))
-
-if problem_formats:
-    for category, items, success_rate in problem_formats:
-        extensions = set(item["extension"] for item in items)
-        md.append(f"- **{category.upper()}** ({success_rate:.1f}% success): {', '.join(sorted(extensions))}")
-else:
-    md.append("- All formats achieved >50% import success rate")
-
-md.append("")
-md.append("## Technical Notes")
-md.append("")
-md.append("### About the Tests")
-md.append("")
-md.append("- Tests were performed with conversion and compatibility checks disabled")
-md.append("- Results show native Apple Photos format support without Smart Media Manager's conversion features")
-md.append("- \"Compatible\" means marked as compatible by the tool")
-md.append("- \"Imported\" means successfully imported into Apple Photos library")
-md.append("- \"Refused\" indicates Apple Photos rejected the file")
-md.append("")
-md.append("### Smart Media Manager Capabilities")
-md.append("")
-md.append("Smart Media Manager can convert many incompatible formats to Apple Photos-compatible formats:")
-md.append("")
-md.append("- **Images**: Converts PSD, WebP, JPEG XL → TIFF/HEIC")
-md.append("- **Videos**: Transcodes VP9, AV1, Theora → HEVC/H.264")
-md.append("- **Containers**: Rewraps MKV, WebM → MP4")
-md.append("- **Audio**: Converts Opus, Vorbis → AAC")
-md.append("")
-md.append("---")
-md.append("")
-md.append(f"*Generated from {total_tested} test samples*")
-
-# Write markdown file
+# Write markdown document, streaming lines straight to the file
 output_file = Path("COMPATIBILITY_SHEET.md")
-with open(output_file, "w") as f:
-    f.write("\n".join(md))
+with open(output_file, "w") as out:
+    print("# Apple Photos Format Compatibility Matrix", file=out)
+    print(file=out)
+    print("Comprehensive test results for media format compatibility with Apple Photos.", file=out)
+    print(file=out)
+    print("## Test Configuration", file=out)
+    print(file=out)
+    print("- **Tool**: Smart Media Manager", file=out)
+    print("- **Test Mode**: Direct import, no conversion", file=out)
+    print("- **Flags**: `--file --skip-renaming --skip-convert --skip-compatibility-check`", file=out)
+    print("- **Total Samples**: " + str(total_tested), file=out)
+    print(file=out)
+    print("## Overall Results", file=out)
+    print(file=out)
+    print(f"| Metric | Count | Percentage |", file=out)
+    print(f"|--------|-------|------------|", file=out)
+    print(f"| **Total files tested** | {total_tested} | 100.0% |", file=out)
+    print(f"| **Successfully imported** | {imported_total} | {imported_total/total_tested*100:.1f}% |", file=out)
+    print(f"| **Marked as compatible** | {compatible_total} | {compatible_total/total_tested*100:.1f}% |", file=out)
+    print(f"| **Refused by Apple Photos** | {refused_total} | {refused_total/total_tested*100:.1f}% |", file=out)
+    print(file=out)
+
+    # Category summary
+    print("## Results by Category", file=out)
+    print(file=out)
+    print("| Category | Imported | Total | Success Rate |", file=out)
+    print("|----------|----------|-------|--------------|", file=out)
+    for category in sorted(by_category.keys()):
+        s = stats[category]
+        print(f"| {category.upper()} | {s['imported']} | {s['total']} | {s['success_rate']:.1f}% |", file=out)
+    print(file=out)
+
+    # Detailed results by category
+    print("## Detailed Results by Category", file=out)
+    print(file=out)
+
+    for category in sorted(by_category.keys()):
+        items = by_category[category]
+        print(f"### {category.upper()}", file=out)
+        print(file=out)
+        print("| File | Extension | Imported | Compatible | Refused |", file=out)
+        print("|------|-----------|----------|------------|---------|", file=out)
+
+        for i in sorted(items, key=files.__getitem__):
+            imported_icon = "✅" if imported[i] else "❌"
+            compatible_icon = "✅" if compatible[i] else "⚠️"
+            refused_icon = "❌" if refused[i] else "✅"
+
+            print(f"| {files[i]} | {extensions[i]} | {imported_icon} | {compatible_icon} | {refused_icon} |", file=out)
+        print(file=out)
+
+    # Format recommendations
+    print("## Format Recommendations", file=out)
+    print(file=out)
+    print("### ✅ Highly Compatible Formats", file=out)
+    print(file=out)
+    print("Based on test results, the following formats show excellent compatibility:", file=out)
+    print(file=out)
+
+    # Find formats with 100% success rate
+    success_formats = []
+    for category in sorted(by_category.keys()):
+        s = stats[category]
+        if s["imported"] == s["total"]:
+            success_formats.append((category, by_category[category]))
+
+    if success_formats:
+        for category, items in success_formats:
+            category_exts = {extensions[i] for i in items}
+            print(f"- **{category.upper()}**: {', '.join(sorted(category_exts))}", file=out)
+    else:
+        print("- No formats achieved 100% import success rate", file=out)
+
+    print(file=out)
+    print("### ⚠️ Problematic Formats", file=out)
+    print(file=out)
+    print("The following formats showed compatibility issues:", file=out)
+    print(file=out)
+
+    # Find formats with <50% success rate
+    problem_formats = []
+    for category in sorted(by_category.keys()):
+        success_rate = stats[category]["success_rate"]
+        if success_rate < 50:
+            problem_formats.append((category, by_category[category], success_rate))
+
+    if problem_formats:
+        for category, items, success_rate in problem_formats:
+            category_exts = {extensions[i] for i in items}
+            print(f"- **{category.upper()}** ({success_rate:.1f}% success): {', '.join(sorted(category_exts))}", file=out)
+    else:
+        print("- All formats achieved >50% import success rate", file=out)
+
+    print(file=out)
+    print("## Technical Notes", file=out)
+    print(file=out)
+    print("### About the Tests", file=out)
+    print(file=out)
+    print("- Tests were performed with conversion and compatibility checks disabled", file=out)
+    print("- Results show native Apple Photos format support without Smart Media Manager's conversion features", file=out)
+    print("- \"Compatible\" means marked as compatible by the tool", file=out)
+    print("- \"Imported\" means successfully imported into Apple Photos library", file=out)
+    print("- \"Refused\" indicates Apple Photos rejected the file", file=out)
+    print(file=out)
+    print("### Smart Media Manager Capabilities", file=out)
+    print(file=out)
+    print("Smart Media Manager can convert many incompatible formats to Apple Photos-compatible formats:", file=out)
+    print(file=out)
+    print("- **Images**: Converts PSD, WebP, JPEG XL → TIFF/HEIC", file=out)
+    print("- **Videos**: Transcodes VP9, AV1, Theora → HEVC/H.264", file=out)
+    print("- **Containers**: Rewraps MKV, WebM → MP4", file=out)
+    print("- **Audio**: Converts Opus, Vorbis → AAC", file=out)
+    print(file=out)
+    print("---", file=out)
+    print(file=out)
+    print(f"*Generated from {total_tested} test samples*", file=out)
 
 print(f"✅ Created {output_file}")
 
@@ -159,9 +181,9 @@ print(f"✅ Created {output_file}")
 json_output = {
     "metadata": {
         "total_samples": total_tested,
-        "imported": len(imported),
-        "compatible": len(compatible),
-        "refused": len(refused),
+        "imported": imported_total,
+        "compatible": compatible_total,
+        "refused": refused_total,
         "test_date": "2025-10-29"
     },
     "by_category": {}
@@ -169,27 +191,30 @@ json_output = {
 
 for category in sorted(by_category.keys()):
     items = by_category[category]
-    imported_count = sum(1 for item in items if item.get("imported"))
+    s = stats[category]
 
     json_output["by_category"][category] = {
-        "total": len(items),
-        "imported": imported_count,
-        "success_rate": imported_count / len(items) * 100 if items else 0,
+        "total": s["total"],
+        "imported": s["imported"],
+        "success_rate": s["success_rate"],
         "files": [
             {
-                "filename": item["file"],
-                "extension": item["extension"],
-                "size": item["size"],
-                "imported": item.get("imported", False),
-                "compatible": item.get("compatible", False),
-                "refused": item.get("refused", False)
+                "filename": files[i],
+                "extension": extensions[i],
+                "size": sizes[i],
+                "imported": imported[i],
+                "compatible": compatible[i],
+                "refused": refused[i]
             }
-            for item in sorted(items, key=lambda x: x["file"])
+            for i in sorted(items, key=files.__getitem__)
         ]
     }
 
 json_file = Path("compatibility.json")
-with open(json_file, "w") as f:
-    json.dump(json_output, f, indent=2)
+if orjson is not None:
+    json_file.write_bytes(orjson.dumps(json_output, option=orjson.OPT_INDENT_2))
+else:
+    with open(json_file, "w") as f:
+        json.dump(json_output, f, indent=2)
 
 print(f"✅ Created {json_file}")
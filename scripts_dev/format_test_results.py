@@ -1,82 +1,161 @@
 #!/usr/bin/env python3
 """Format test results into a nice table."""
 
+import ast
+import json
+import os
 import subprocess
 import re
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-def get_test_info():
-    """Extract test information with docstrings."""
-    result = subprocess.run(
-        ["uv", "run", "pytest", "tests/", "--collect-only", "-q"],
-        capture_output=True,
-        text=True,
-        cwd=Path(__file__).parent
-    )
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DOCSTRING_CACHE = Path.home() / '.cache' / 'smart-media-manager' / 'docstrings.json'
 
-    tests = []
-    for line in result.stdout.split('\n'):
-        if '::test_' in line or '::Test' in line:
-            tests.append(line.strip())
+# One verbose result line: "tests/<file>::<node> PASSED"
+_RESULT_RE = re.compile(r'tests/([^:\s]+)::(\S+)[ \t]+(PASSED|FAILED|SKIPPED)')
 
-    return tests
+# Color coded status cell contents, one per outcome matched by _RESULT_RE
+_STATUS_DISPLAY = {
+    'PASSED': "✅ PASS ",
+    'FAILED': "❌ FAIL ",
+    'SKIPPED': "⏭️  SKIP ",
+}
 
 def run_tests():
-    """Run tests and capture results."""
-    result = subprocess.run(
-        ["uv", "run", "pytest", "tests/", "-v", "--tb=no"],
-        capture_output=True,
+    """Run tests and parse results as pytest reports them.
+
+    The verbose output lists every collected node id with its outcome, so it
+    doubles as the test inventory; no separate ``--collect-only`` pass is run.
+    Output is consumed line by line, so nothing is buffered beyond the parsed
+    rows and parsing overlaps with test execution.
+    """
+    proc = subprocess.Popen(
+        [
+            "uv", "run", "pytest", "tests/", "-v", "--tb=no",
+            # sys-level capture keeps test prints off the result lines without
+            # the per-test fd dup/restore cost; the cache plugins are unused here
+            "--capture=sys", "-p", "no:cacheprovider", "-p", "no:stepwise",
+        ],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
         text=True,
-        cwd=Path(__file__).parent,
-        timeout=300
+        bufsize=1,
+        cwd=PROJECT_ROOT,
     )
+    # Same 300s budget as before: kill the run so the stdout loop ends
+    watchdog = threading.Timer(300, proc.kill)
+    watchdog.start()
+    try:
+        with proc.stdout:
+            tests = parse_results(proc.stdout)
+        proc.wait()
+    finally:
+        watchdog.cancel()
 
-    return result.stdout
+    return tests
 
-def parse_results(output):
-    """Parse pytest output into structured data."""
+def parse_results(lines):
+    """Parse pytest output lines into structured data."""
     tests = []
 
-    for line in output.split('\n'):
-        if '::test_' in line or ('::Test' in line and 'test_' in line):
-            # Extract file, test name, and result
-            match = re.search(r'tests/([^:]+)::([^\s]+)\s+(PASSED|FAILED|SKIPPED)', line)
-            if match:
-                file_name, test_name, status = match.groups()
-                tests.append({
-                    'file': file_name,
-                    'test': test_name,
-                    'status': status
-                })
+    for line in lines:
+        match = _RESULT_RE.search(line)
+        if match:
+            tests.append({'file': match[1], 'test': match[2], 'status': match[3]})
 
     return tests
 
-def get_test_docstrings():
-    """Extract test docstrings from test files."""
+def _parse_file(test_file):
+    """Return {test_name: first docstring line} for one test module."""
     docstrings = {}
-    test_dir = Path(__file__).parent / 'tests'
+    tree = ast.parse(Path(test_file).read_text(), filename=str(test_file))
+
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name.startswith('test_'):
+            doc = ast.get_docstring(node)
+            if doc:
+                # Keep only the summary line
+                docstrings[node.name] = doc.split('\n', 1)[0].strip()
+
+    return docstrings
+
+def _load_docstring_cache():
+    """Load the per-file docstring cache, or an empty one if unusable."""
+    try:
+        return json.loads(DOCSTRING_CACHE.read_text())
+    except (OSError, ValueError):
+        return {}
 
-    for test_file in test_dir.glob('test_*.py'):
-        content = test_file.read_text()
+def _save_docstring_cache(cache):
+    """Atomically replace the docstring cache file."""
+    DOCSTRING_CACHE.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = DOCSTRING_CACHE.with_suffix('.tmp')
+    tmp_path.write_text(json.dumps(cache))
+    os.replace(tmp_path, DOCSTRING_CACHE)
 
-        # Find all test functions and their docstrings
-        pattern = r'def (test_\w+)\([^)]*\):\s*"""([^"]+)"""'
-        matches = re.findall(pattern, content, re.MULTILINE)
+def get_test_docstrings():
+    """Extract test docstrings from test files.
+
+    Files whose mtime and size match the cached entry are not re-parsed.
+    """
+    cache = _load_docstring_cache()
+    fresh_cache = {}
+    stale = []
+
+    for test_file in sorted((PROJECT_ROOT / 'tests').glob('test_*.py')):
+        st = test_file.stat()
+        key = str(test_file)
+        entry = cache.get(key)
+        if entry and entry['mtime'] == st.st_mtime_ns and entry['size'] == st.st_size:
+            fresh_cache[key] = entry
+        else:
+            fresh_cache[key] = {'mtime': st.st_mtime_ns, 'size': st.st_size, 'doc': {}}
+            stale.append(key)
+
+    if stale:
+        # Parsing is CPU-bound and independent per file
+        with ProcessPoolExecutor() as executor:
+            for key, file_docstrings in zip(stale, executor.map(_parse_file, stale)):
+                fresh_cache[key]['doc'] = file_docstrings
+
+    # Rewrite when files changed, appeared or disappeared
+    if stale or fresh_cache.keys() != cache.keys():
+        _save_docstring_cache(fresh_cache)
 
-        for test_name, docstring in matches:
-            # Clean up docstring
-            first_line = docstring.strip().split('\n')[0]
-            docstrings[test_name] = first_line
+    docstrings = {}
+    for entry in fresh_cache.values():
+        docstrings.update(entry['doc'])
 
     return docstrings
 
 def format_table(tests, docstrings):
     """Format tests into a nice unicode table."""
-    # Calculate column widths
-    max_file = max(len(t['file']) for t in tests) if tests else 20
-    max_test = max(len(t['test']) for t in tests) if tests else 40
     max_desc = 80  # Cap description length
 
+    # Calculate column widths and resolve row fields in a single pass
+    max_file = max_test = 0
+    rows = []
+    for test in tests:
+        file_name = test['file']
+        test_name = test['test'].rsplit('::', 1)[-1]  # Get function name if class::method
+        if len(file_name) > max_file:
+            max_file = len(file_name)
+        if len(test_name) > max_test:
+            max_test = len(test_name)
+
+        desc = docstrings.get(test_name, "")
+        # Truncate description if too long
+        if len(desc) > max_desc:
+            desc = desc[:max_desc-3] + "..."
+
+        rows.append((file_name, test_name, desc, test['status']))
+
+    if not rows:
+        max_file, max_test = 20, 40
+
     # Table borders
     thick_line = '═'
     thin_line = '─'
@@ -101,47 +180,32 @@ def format_table(tests, docstrings):
     vert = '│'
     vert_thick = '║'
 
+    # Border segments, shared by header, separator and footer
+    seg_file = thick_line * (max_file + 2)
+    seg_test = thick_line * (max_test + 2)
+    seg_desc = thick_line * (max_desc + 2)
+    seg_status = thick_line * 8
+
     # Header
-    header_line = (thick_corner_tl + thick_line * (max_file + 2) +
-                   thick_t_down + thick_line * (max_test + 2) +
-                   thick_t_down + thick_line * (max_desc + 2) +
-                   thick_t_down + thick_line * 8 + thick_corner_tr)
+    header_line = (thick_corner_tl + seg_file + thick_t_down + seg_test +
+                   thick_t_down + seg_desc + thick_t_down + seg_status + thick_corner_tr)
 
-    print(header_line)
-    print(f"{vert_thick} {'File':<{max_file}} {vert_thick} {'Test Function':<{max_test}} {vert_thick} {'Description':<{max_desc}} {vert_thick} Status {vert_thick}")
+    out = [header_line]
+    out.append(f"{vert_thick} {'File':<{max_file}} {vert_thick} {'Test Function':<{max_test}} {vert_thick} {'Description':<{max_desc}} {vert_thick} Status {vert_thick}")
 
-    separator = (thick_t_right + thick_line * (max_file + 2) +
-                 thick_cross + thick_line * (max_test + 2) +
-                 thick_cross + thick_line * (max_desc + 2) +
-                 thick_cross + thick_line * 8 + thick_t_left)
-    print(separator)
+    separator = (thick_t_right + seg_file + thick_cross + seg_test +
+                 thick_cross + seg_desc + thick_cross + seg_status + thick_t_left)
+    out.append(separator)
 
     # Body
-    for test in tests:
-        test_name = test['test'].split('::')[-1]  # Get function name if class::method
-        desc = docstrings.get(test_name, "")
-
-        # Truncate description if too long
-        if len(desc) > max_desc:
-            desc = desc[:max_desc-3] + "..."
-
-        # Color code status
-        status = test['status']
-        if status == 'PASSED':
-            status_display = f"✅ PASS "
-        elif status == 'FAILED':
-            status_display = f"❌ FAIL "
-        else:  # SKIPPED
-            status_display = f"⏭️  SKIP "
-
-        print(f"{vert} {test['file']:<{max_file}} {vert} {test_name:<{max_test}} {vert} {desc:<{max_desc}} {vert} {status_display}{vert}")
+    for file_name, test_name, desc, status in rows:
+        status_display = _STATUS_DISPLAY.get(status, status)
+        out.append(f"{vert} {file_name:<{max_file}} {vert} {test_name:<{max_test}} {vert} {desc:<{max_desc}} {vert} {status_display}{vert}")
 
     # Footer
-    footer = (thick_corner_bl + thick_line * (max_file + 2) +
-              thick_t_up + thick_line * (max_test + 2) +
-              thick_t_up + thick_line * (max_desc + 2) +
-              thick_t_up + thick_line * 8 + thick_corner_br)
-    print(footer)
+    footer = (thick_corner_bl + seg_file + thick_t_up + seg_test +
+              thick_t_up + seg_desc + thick_t_up + seg_status + thick_corner_br)
+    out.append(footer)
 
     # Summary
     total = len(tests)
@@ -149,12 +213,15 @@ def format_table(tests, docstrings):
     failed = sum(1 for t in tests if t['status'] == 'FAILED')
     skipped = sum(1 for t in tests if t['status'] == 'SKIPPED')
 
-    print(f"\n📊 Summary: {total} tests | ✅ {passed} passed | ❌ {failed} failed | ⏭️  {skipped} skipped")
-    print(f"📈 Success rate: {passed/total*100:.1f}%")
+    out.append(f"\n📊 Summary: {total} tests | ✅ {passed} passed | ❌ {failed} failed | ⏭️  {skipped} skipped")
+    out.append(f"📈 Success rate: {passed/total*100:.1f}%")
+
+    # One write instead of a lock/flush per printed row
+    out.append('')
+    sys.stdout.write('\n'.join(out))
 
 if __name__ == '__main__':
     print("Running tests and collecting results...\n")
-    output = run_tests()
-    tests = parse_results(output)
+    tests = run_tests()
     docstrings = get_test_docstrings()
     format_table(tests, docstrings)
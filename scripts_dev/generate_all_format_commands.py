@@ -1,23 +1,83 @@
 #!/usr/bin/env python3
 """Generate all possible ffmpeg format conversion commands."""
 
+import json
+import os
 import re
 from pathlib import Path
 from itertools import product
+from functools import lru_cache
 from typing import List, Dict, Tuple
 
+try:
+    import orjson
+except ImportError:  # optional: faster JSON serialization
+    orjson = None
+
+# Row layouts of `ffmpeg -formats`, `-codecs` and `-pix_fmts` listings
+FORMAT_RE = re.compile(r'\s*([DE\s]{2})\s+(\S+)\s+(.+)')
+CODEC_RE = re.compile(r'\s*([DEVAILS\.]{6})\s+(\S+)\s+(.+)')
+PIX_FMT_RE = re.compile(r'\s*([IO\.]{5})\s+(\S+)')
+
+# File extension to use for each ffmpeg muxer/format name
+EXTENSION_MAP = {
+    'mp4': '.mp4', 'mov': '.mov', 'mkv': '.mkv', 'avi': '.avi', 'webm': '.webm',
+    'flv': '.flv', 'wmv': '.wmv', 'mpg': '.mpg', 'mpeg': '.mpeg', '3gp': '.3gp',
+    '3g2': '.3g2', 'ts': '.ts', 'mts': '.mts', 'm2ts': '.m2ts', 'vob': '.vob',
+    'asf': '.asf', 'ogv': '.ogv', 'ogg': '.ogg', 'f4v': '.f4v', 'gif': '.gif',
+    'apng': '.apng', 'mxf': '.mxf', 'gxf': '.gxf', 'nut': '.nut', 'dv': '.dv',
+    'matroska': '.mkv', 'ipod': '.m4v', 'ismv': '.ismv',
+    'mp3': '.mp3', 'aac': '.aac', 'ac3': '.ac3', 'flac': '.flac', 'wav': '.wav',
+    'opus': '.opus', 'aiff': '.aiff', 'au': '.au', 'caf': '.caf',
+    'image2': '.png', 'png': '.png', 'jpg': '.jpg', 'jpeg': '.jpg', 'tiff': '.tiff',
+    'bmp': '.bmp', 'webp': '.webp', 'avif': '.avif',
+    'hevc': '.hevc', 'h264': '.h264', 'h263': '.h263', 'mjpeg': '.mjpeg',
+    'rawvideo': '.yuv', 'dnxhd': '.dnxhd', 'prores': '.mov'
+}
+
+# Codecs each container accepts; containers not listed (e.g. MKV, which is
+# very flexible) accept anything
+WEBM_VIDEO = frozenset({'vp8', 'vp9', 'av1', 'libaom-av1', 'libvpx', 'libvpx-vp9'})
+WEBM_AUDIO = frozenset({'libvorbis', 'vorbis', 'libopus', 'opus'})
+OGG_VIDEO = frozenset({'libtheora', 'theora'})
+OGG_AUDIO = frozenset({'libvorbis', 'vorbis', 'libopus', 'opus', 'flac'})
+MP4_VIDEO = frozenset({'libx264', 'h264', 'libx265', 'hevc', 'mpeg4', 'mpeg2video',
+                       'libvpx-vp9', 'libaom-av1', 'mjpeg', 'png', 'prores'})
+MP4_AUDIO = frozenset({'aac', 'mp3', 'ac3', 'eac3', 'alac', 'pcm_s16le', 'pcm_s24le',
+                       'libfdk_aac', 'libmp3lame'})
+FLV_VIDEO = frozenset({'libx264', 'h264', 'flv', 'vp6'})
+FLV_AUDIO = frozenset({'mp3', 'aac', 'libmp3lame', 'libfdk_aac'})
+MP4_FAMILY = ('mp4', 'mov', 'ipod', 'ismv', 'f4v')
+
+CONTAINER_VIDEO_CODECS = {
+    'webm': WEBM_VIDEO,
+    'ogg': OGG_VIDEO,
+    'ogv': OGG_VIDEO,
+    'flv': FLV_VIDEO,
+    **dict.fromkeys(MP4_FAMILY, MP4_VIDEO),
+}
+CONTAINER_AUDIO_CODECS = {
+    'webm': WEBM_AUDIO,
+    'ogg': OGG_AUDIO,
+    'ogv': OGG_AUDIO,
+    'flv': FLV_AUDIO,
+    **dict.fromkeys(MP4_FAMILY, MP4_AUDIO),
+}
+
+# Video codecs AVI doesn't handle well
+AVI_UNSUPPORTED_VIDEO = frozenset({'vp9', 'av1', 'hevc'})
+
 def parse_formats(file_path: str) -> List[Dict]:
     """Parse formats/muxers from ffprobe output."""
     formats = []
     with open(file_path) as f:
-        lines = f.readlines()
         started = False
-        for line in lines:
+        for line in f:
             if line.strip().startswith('--'):
                 started = True
                 continue
             if started and line.strip():
-                match = re.match(r'\s*([DE\s]{2})\s+(\S+)\s+(.+)', line)
+                match = FORMAT_RE.match(line)
                 if match:
                     flags, name, description = match.groups()
                     if 'E' in flags:  # Can encode
@@ -28,28 +88,39 @@ def parse_formats(file_path: str) -> List[Dict]:
                         })
     return formats
 
-def parse_codecs(file_path: str, codec_type: str) -> List[Dict]:
-    """Parse video or audio codecs from ffprobe output."""
-    codecs = []
+@lru_cache(maxsize=None)
+def parse_codec_table(file_path: str, mtime: float) -> Dict[str, List[Dict]]:
+    """Parse encodable video and audio codecs from ffprobe output in one pass.
+
+    ``mtime`` is part of the cache key so an updated file is re-read.
+    """
+    codecs = {'video': [], 'audio': []}
     with open(file_path) as f:
-        lines = f.readlines()
         started = False
-        for line in lines:
+        for line in f:
             if line.strip().startswith('------'):
                 started = True
                 continue
             if started and line.strip():
-                match = re.match(r'\s*([DEVAILS\.]{6})\s+(\S+)\s+(.+)', line)
+                match = CODEC_RE.match(line)
                 if match:
                     flags, name, description = match.groups()
-                    type_flag = 'V' if codec_type == 'video' else 'A'
-                    if type_flag in flags and 'E' in flags:  # Can encode
-                        codecs.append({
-                            'name': name.strip(),
-                            'description': description.strip()
-                        })
+                    if 'E' not in flags:  # Can't encode
+                        continue
+                    codec = {
+                        'name': name.strip(),
+                        'description': description.strip()
+                    }
+                    if 'V' in flags:
+                        codecs['video'].append(codec)
+                    if 'A' in flags:
+                        codecs['audio'].append(codec)
     return codecs
 
+def parse_codecs(file_path: str, codec_type: str) -> List[Dict]:
+    """Parse video or audio codecs from ffprobe output."""
+    return list(parse_codec_table(file_path, os.path.getmtime(file_path))[codec_type])
+
 def parse_pix_fmts(file_path: str, limit: int = 50) -> List[str]:
     """Parse pixel formats, return most common ones."""
     pix_fmts = []
@@ -60,29 +131,34 @@ def parse_pix_fmts(file_path: str, limit: int = 50) -> List[str]:
     ]
 
     with open(file_path) as f:
-        lines = f.readlines()
         started = False
-        for line in lines:
+        for line in f:
             if line.strip().startswith('-----'):
                 started = True
                 continue
             if started and line.strip():
-                match = re.match(r'\s*([IO\.]{5})\s+(\S+)', line)
+                match = PIX_FMT_RE.match(line)
                 if match:
                     flags, name = match.groups()
                     if 'O' in flags:  # Can output
                         pix_fmts.append(name.strip())
 
     # Prioritize common formats
+    available = set(pix_fmts)
     result = []
+    seen = set()
     for fmt in common_formats:
-        if fmt in pix_fmts:
+        if fmt in available and fmt not in seen:
             result.append(fmt)
+            seen.add(fmt)
 
     # Add others up to limit
     for fmt in pix_fmts:
-        if fmt not in result and len(result) < limit:
+        if len(result) >= limit:
+            break
+        if fmt not in seen:
             result.append(fmt)
+            seen.add(fmt)
 
     return result[:limit]
 
@@ -98,72 +174,34 @@ def parse_sample_fmts(file_path: str) -> List[str]:
                     sample_fmts.append(parts[0])
     return sample_fmts
 
+@lru_cache(maxsize=None)
 def get_common_extension(format_name: str) -> str:
     """Get file extension for format."""
-    extension_map = {
-        'mp4': '.mp4', 'mov': '.mov', 'mkv': '.mkv', 'avi': '.avi', 'webm': '.webm',
-        'flv': '.flv', 'wmv': '.wmv', 'mpg': '.mpg', 'mpeg': '.mpeg', '3gp': '.3gp',
-        '3g2': '.3g2', 'ts': '.ts', 'mts': '.mts', 'm2ts': '.m2ts', 'vob': '.vob',
-        'asf': '.asf', 'ogv': '.ogv', 'ogg': '.ogg', 'f4v': '.f4v', 'gif': '.gif',
-        'apng': '.apng', 'mxf': '.mxf', 'gxf': '.gxf', 'nut': '.nut', 'dv': '.dv',
-        'matroska': '.mkv', 'webm': '.webm', 'ipod': '.m4v', 'ismv': '.ismv',
-        'mp3': '.mp3', 'aac': '.aac', 'ac3': '.ac3', 'flac': '.flac', 'wav': '.wav',
-        'opus': '.opus', 'ogg': '.ogg', 'aiff': '.aiff', 'au': '.au', 'caf': '.caf',
-        'image2': '.png', 'png': '.png', 'jpg': '.jpg', 'jpeg': '.jpg', 'tiff': '.tiff',
-        'bmp': '.bmp', 'gif': '.gif', 'webp': '.webp', 'avif': '.avif',
-        'hevc': '.hevc', 'h264': '.h264', 'h263': '.h263', 'mjpeg': '.mjpeg',
-        'rawvideo': '.yuv', 'dnxhd': '.dnxhd', 'prores': '.mov'
-    }
-    return extension_map.get(format_name, f'.{format_name}')
+    return EXTENSION_MAP.get(format_name, f'.{format_name}')
 
-def filter_compatible_combinations(container: Dict, video_codec: Dict, audio_codec: Dict) -> bool:
-    """Check if container/codec combination is valid."""
-    # Known incompatible combinations
-    container_name = container['name']
-    video_name = video_codec['name']
-    audio_name = audio_codec['name']
-
-    # WebM only supports VP8/VP9/AV1 + Vorbis/Opus
-    if container_name == 'webm':
-        if video_name not in ['vp8', 'vp9', 'av1', 'libaom-av1', 'libvpx', 'libvpx-vp9']:
-            return False
-        if audio_name not in ['libvorbis', 'vorbis', 'libopus', 'opus']:
-            return False
-
-    # OGG/OGV typically uses Theora + Vorbis
-    if container_name in ['ogg', 'ogv']:
-        if video_name not in ['libtheora', 'theora'] and video_name:
-            return False
-        if audio_name not in ['libvorbis', 'vorbis', 'libopus', 'opus', 'flac']:
-            return False
-
-    # MP4/MOV prefer H.264/HEVC/MPEG-4 + AAC/MP3
-    if container_name in ['mp4', 'mov', 'ipod', 'ismv', 'f4v']:
-        valid_video = ['libx264', 'h264', 'libx265', 'hevc', 'mpeg4', 'mpeg2video',
-                       'libvpx-vp9', 'libaom-av1', 'mjpeg', 'png', 'prores']
-        valid_audio = ['aac', 'mp3', 'ac3', 'eac3', 'alac', 'pcm_s16le', 'pcm_s24le',
-                       'libfdk_aac', 'libmp3lame']
-        if video_name and video_name not in valid_video:
-            return False
-        if audio_name and audio_name not in valid_audio:
-            return False
-
-    # MKV is very flexible, accepts almost anything
+def is_video_compatible(container_name: str, video_name: str) -> bool:
+    """Check if a video codec is valid in a container."""
+    allowed = CONTAINER_VIDEO_CODECS.get(container_name)
+    if allowed is not None and video_name not in allowed:
+        return False
 
     # AVI prefers older codecs
-    if container_name == 'avi':
-        if video_name in ['vp9', 'av1', 'hevc']:  # AVI doesn't handle these well
-            return False
-
-    # FLV prefers H.264/VP6 + MP3/AAC
-    if container_name == 'flv':
-        if video_name not in ['libx264', 'h264', 'flv', 'vp6']:
-            return False
-        if audio_name not in ['mp3', 'aac', 'libmp3lame', 'libfdk_aac']:
-            return False
+    if container_name == 'avi' and video_name in AVI_UNSUPPORTED_VIDEO:
+        return False
 
     return True
 
+def is_audio_compatible(container_name: str, audio_name: str) -> bool:
+    """Check if an audio codec is valid in a container."""
+    allowed = CONTAINER_AUDIO_CODECS.get(container_name)
+    return allowed is None or audio_name in allowed
+
+def filter_compatible_combinations(container: Dict, video_codec: Dict, audio_codec: Dict) -> bool:
+    """Check if container/codec combination is valid."""
+    # Video and audio rules are independent of each other
+    return (is_video_compatible(container['name'], video_codec['name']) and
+            is_audio_compatible(container['name'], audio_codec['name']))
+
 def generate_video_commands(input_file: str, base_output_dir: str) -> List[Dict]:
     """Generate all video conversion commands."""
     commands = []
@@ -192,29 +230,31 @@ def generate_video_commands(input_file: str, base_output_dir: str) -> List[Dict]
 
     test_id = 0
 
-    # Generate basic container + codec combinations
+    # Generate basic container + codec combinations. Codecs are pruned per
+    # container up front, so only compatible (video, audio) pairs are visited.
     for container in formats:
-        for video_codec in video_codecs:
-            for audio_codec in audio_codecs:
-                if not filter_compatible_combinations(container, video_codec, audio_codec):
-                    continue
-
+        valid_video = [v for v in video_codecs if is_video_compatible(container['name'], v['name'])]
+        valid_audio = [a for a in audio_codecs if is_audio_compatible(container['name'], a['name'])]
+        for video_codec in valid_video:
+            for audio_codec in valid_audio:
                 test_id += 1
                 output_file = f"{base_output_dir}/test_{test_id:04d}_{container['name']}_{video_codec['name']}_{audio_codec['name']}{container['extensions']}"
 
-                cmd = f"ffmpeg -y -i {input_file} -t 3 -c:v {video_codec['name']} -c:a {audio_codec['name']}"
+                video_name = video_codec['name']
+                parts = ["ffmpeg -y -i", input_file, "-t 3 -c:v", video_name, "-c:a", audio_codec['name']]
 
                 # Add preset for x264/x265 for speed
-                if 'x264' in video_codec['name'] or 'x265' in video_codec['name']:
-                    cmd += " -preset ultrafast"
+                if 'x264' in video_name or 'x265' in video_name:
+                    parts.append("-preset ultrafast")
 
                 # Add specific flags for some codecs
-                if video_codec['name'] == 'libaom-av1':
-                    cmd += " -cpu-used 8"
-                elif video_codec['name'] in ['libvpx', 'libvpx-vp9']:
-                    cmd += " -deadline realtime -cpu-used 8"
+                if video_name == 'libaom-av1':
+                    parts.append("-cpu-used 8")
+                elif video_name in ['libvpx', 'libvpx-vp9']:
+                    parts.append("-deadline realtime -cpu-used 8")
 
-                cmd += f" {output_file}"
+                parts.append(output_file)
+                cmd = " ".join(parts)
 
                 commands.append({
                     'id': test_id,
@@ -298,7 +338,9 @@ def generate_image_commands(input_file: str, base_output_dir: str) -> List[Dict]
 
 def save_commands_to_file(commands: List[Dict], output_file: str):
     """Save commands to a JSON file."""
-    import json
+    if orjson is not None:
+        Path(output_file).write_bytes(orjson.dumps(commands, option=orjson.OPT_INDENT_2))
+        return
     with open(output_file, 'w') as f:
         json.dump(commands, f, indent=2)
 
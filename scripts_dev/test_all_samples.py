@@ -1,121 +1,253 @@
 #!/usr/bin/env python3
 """Test all format samples and collect results."""
 
+import argparse
+import hashlib
 import json
+import os
+import re
+import shutil
+import signal
 import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from datetime import datetime
+
+try:
+    import orjson
+except ImportError:  # optional: faster JSON serialization
+    orjson = None
 
 # Directories
 SAMPLES_DIR = Path("tests/samples/format_tests")
 RESULTS_DIR = Path("format_tests_results")
-RESULTS_DIR.mkdir(exist_ok=True)
 
-# Get all test files
-test_files = sorted([f for f in SAMPLES_DIR.iterdir() if f.is_file() and f.name.startswith("test_")])
+# "Imported (direct): N" line of the smart-media-manager summary
+_IMPORTED_RE = re.compile(rb"Imported \(direct\):[ \t]*(\d+)")
+
+# smart-media-manager argv around the sample path; the same for every file
+CMD_PREFIX = ["uv", "run", "smart-media-manager"]
+CMD_FLAGS = ["--file", "--skip-renaming", "--skip-convert", "--skip-compatibility-check"]
+CMD_PREFIX_STR = " ".join(CMD_PREFIX)
+CMD_FLAGS_STR = " ".join(CMD_FLAGS)
+
+# Samples imported by an earlier run with the same file and argv are not
+# imported again; the cache maps a fingerprint to that run's result
+CACHE_FILE = RESULTS_DIR / ".cache.json"
+ARGV_DIGEST = hashlib.blake2b("\0".join([*CMD_PREFIX, *CMD_FLAGS]).encode(), digest_size=8).hexdigest()
+
+# Seconds before a smart-media-manager run is killed
+TIMEOUT = 120
+
+# Trailing stdout lines kept in test_results.json; the summary that
+# analyze_test_results.py parses is printed last. Full output is in the log.
+STDOUT_TAIL_LINES = 100
+
+
+def cache_key(entry):
+    """Fingerprint a sample by name, size, mtime and the argv it is tested with."""
+    st = entry.stat()
+    return f"{entry.name}:{st.st_size}:{st.st_mtime_ns}:{ARGV_DIGEST}"
+
+
+def load_cache():
+    """Load the import cache, or an empty one if unusable."""
+    try:
+        data = CACHE_FILE.read_bytes()
+        return orjson.loads(data) if orjson is not None else json.loads(data)
+    except (OSError, ValueError):
+        return {}
 
-print(f"Found {len(test_files)} test files to process")
-print("=" * 80)
 
-results = []
+def save_cache(cache):
+    """Atomically replace the import cache file."""
+    tmp_path = CACHE_FILE.with_suffix(".tmp")
+    if orjson is not None:
+        tmp_path.write_bytes(orjson.dumps(cache))
+    else:
+        tmp_path.write_text(json.dumps(cache))
+    os.replace(tmp_path, CACHE_FILE)
 
-for i, test_file in enumerate(test_files, 1):
-    print(f"\n[{i}/{len(test_files)}] Testing: {test_file.name}")
 
+def run_one(entry):
+    """Run smart-media-manager on one sample, save its log and return the result."""
+    stem, extension = os.path.splitext(entry.name)
     result = {
-        "file": test_file.name,
-        "size": test_file.stat().st_size,
-        "extension": test_file.suffix,
-        "timestamp": datetime.now().isoformat(),
+        "file": entry.name,
+        "size": entry.stat().st_size,
+        "extension": extension,
+        "timestamp_ns": time.time_ns(),  # Unix epoch nanoseconds
     }
 
     # Run smart-media-manager
-    cmd = [
-        "uv", "run", "smart-media-manager",
-        str(test_file),
-        "--file",
-        "--skip-renaming",
-        "--skip-convert",
-        "--skip-compatibility-check",
-    ]
+    cmd = [*CMD_PREFIX, entry.path, *CMD_FLAGS]
 
+    log_file = RESULTS_DIR / f"{stem}.log"
     try:
-        proc = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=120,
-        )
+        # Stream stdout straight into the log as raw bytes, keeping only its
+        # tail in memory; stderr is spooled to a temporary file for the log's
+        # STDERR section. Only the tail is ever decoded.
+        with open(log_file, "wb") as f, tempfile.TemporaryFile() as stderr_file:
+            f.write(f"Test file: {entry.path}\nCommand: {CMD_PREFIX_STR} {entry.path} {CMD_FLAGS_STR}\n\n=== STDOUT ===\n".encode())
+
+            # Own process group, so a timeout also kills what `uv run` spawned
+            # and the stdout pipe closes
+            proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr_file, start_new_session=True)
+            timed_out = threading.Event()
+
+            def kill_on_timeout():
+                timed_out.set()
+                try:
+                    os.killpg(proc.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass  # Exited just as the timer fired
+
+            watchdog = threading.Timer(TIMEOUT, kill_on_timeout)
+            watchdog.start()
+            try:
+                tail = deque(maxlen=STDOUT_TAIL_LINES)
+                has_summary = False
+                match = None
+                with proc.stdout:
+                    for line in proc.stdout:
+                        f.write(line)
+                        tail.append(line)
+                        if not has_summary:
+                            has_summary = b"Successfully imported" in line or b"Total imported:" in line
+                        if match is None and b"Imported (direct):" in line:
+                            match = _IMPORTED_RE.search(line)
+                proc.wait()
+            finally:
+                watchdog.cancel()
+            if timed_out.is_set():
+                raise subprocess.TimeoutExpired(cmd, TIMEOUT)
+
+            stderr_file.seek(0)
+            f.write(b"\n\n=== STDERR ===\n")
+            shutil.copyfileobj(stderr_file, f)
+            f.write(f"\n\n=== EXIT CODE ===\n{proc.returncode}\n".encode())
 
         result["exit_code"] = proc.returncode
-        result["stdout"] = proc.stdout
-        result["stderr"] = proc.stderr
-
-        # Parse import status
-        if "Successfully imported" in proc.stdout or "Total imported:" in proc.stdout:
-            # Check if actual import happened
-            if "Imported (direct):" in proc.stdout:
-                # Extract number
-                for line in proc.stdout.split("\n"):
-                    if "Imported (direct):" in line:
-                        # Look for number after the colon
-                        parts = line.split(":")
-                        if len(parts) > 1:
-                            num_str = parts[1].strip().split()[0]
-                            try:
-                                imported = int(num_str)
-                                result["imported"] = imported > 0
-                            except:
-                                result["imported"] = False
-                        break
-            else:
-                result["imported"] = False
-        else:
-            result["imported"] = False
-
-        # Save individual log
-        log_file = RESULTS_DIR / f"{test_file.stem}.log"
-        with open(log_file, "w") as f:
-            f.write(f"Test file: {test_file}\n")
-            f.write(f"Command: {' '.join(cmd)}\n")
-            f.write(f"\n=== STDOUT ===\n{proc.stdout}\n")
-            f.write(f"\n=== STDERR ===\n{proc.stderr}\n")
-            f.write(f"\n=== EXIT CODE ===\n{proc.returncode}\n")
+        result["stdout_tail"] = b"".join(tail).decode("utf-8", "replace")
 
-        result["log_file"] = str(log_file)
+        # Parse import status: the direct import count, once a summary exists
+        result["imported"] = has_summary and match is not None and int(match[1]) > 0
 
-        if result.get("imported"):
-            print(f"  ✅ IMPORTED")
-        elif proc.returncode == 0:
-            print(f"  ⚠️  Processed but not imported")
-        else:
-            print(f"  ❌ FAILED (exit code {proc.returncode})")
+        result["log_file"] = str(log_file)
 
     except subprocess.TimeoutExpired:
         result["error"] = "timeout"
         result["imported"] = False
-        print(f"  ⏱️  TIMEOUT")
-    except Exception as e:
+    except OSError as e:
+        # uv missing, unreadable sample or unwritable log; anything else is a
+        # bug in this script and should surface through future.result()
         result["error"] = str(e)
         result["imported"] = False
-        print(f"  ❌ ERROR: {e}")
 
-    results.append(result)
+    return result
+
+
+def status_line(result):
+    """Describe the outcome of one sample for the progress output."""
+    if result.get("error") == "timeout":
+        return "  ⏱️  TIMEOUT"
+    if "error" in result:
+        return f"  ❌ ERROR: {result['error']}"
+    if result.get("cached"):
+        return "  ✅ IMPORTED (cached)"
+    if result.get("imported"):
+        return "  ✅ IMPORTED"
+    if result["exit_code"] == 0:
+        return "  ⚠️  Processed but not imported"
+    return f"  ❌ FAILED (exit code {result['exit_code']})"
+
+
+parser = argparse.ArgumentParser(description=__doc__)
+parser.add_argument(
+    "--jobs", "-j", type=int, default=min(32, (os.cpu_count() or 1) * 2),
+    help="Samples to test concurrently (use 1 to import one file at a time)",
+)
+parser.add_argument("--force", action="store_true", help="Re-test samples already imported by an earlier run")
+args = parser.parse_args()
+
+RESULTS_DIR.mkdir(exist_ok=True)
+
+# Get all test files; scandir entries carry the file type from the directory
+# read and cache their stat result
+test_files = sorted(
+    (entry for entry in os.scandir(SAMPLES_DIR) if entry.name.startswith("test_") and entry.is_file()),
+    key=lambda entry: entry.name,
+)
+
+print(f"Found {len(test_files)} test files to process")
+print("=" * 80)
+
+cache = {} if args.force else load_cache()
+fresh_cache = {}
+
+
+def run_cached(entry):
+    """Return the cached result for an unchanged, already imported sample, else run it."""
+    cached = cache.get(cache_key(entry))
+    if cached is not None:
+        return {**cached, "cached": True}
+    return run_one(entry)
+
+
+results = [None] * len(test_files)
+imported = failed = processed = 0
+
+# Every finished result is also appended to a JSONL checkpoint as it arrives,
+# so an interrupted run keeps what it completed
+checkpoint_file = RESULTS_DIR / "test_results.jsonl"
+
+# Each task blocks on its subprocess, which releases the GIL, so threads keep
+# several smart-media-manager processes busy at once. Results are reported and
+# tallied in completion order and stored at their input index.
+with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as executor, open(checkpoint_file, "wb") as checkpoint:
+    future_to_idx = {executor.submit(run_cached, entry): idx for idx, entry in enumerate(test_files)}
+    try:
+        for i, future in enumerate(as_completed(future_to_idx), 1):
+            idx = future_to_idx[future]
+            result = results[idx] = future.result()
+            print(f"\n[{i}/{len(test_files)}] Testing: {result['file']}")
+            print(status_line(result))
+
+            checkpoint.write(orjson.dumps(result) + b"\n" if orjson is not None else json.dumps(result).encode() + b"\n")
+            checkpoint.flush()
+
+            if result.get("imported"):
+                imported += 1
+                fresh_cache[cache_key(test_files[idx])] = {k: v for k, v in result.items() if k != "cached"}
+            elif result.get("exit_code", 1) != 0:
+                failed += 1
+            else:
+                processed += 1
+    except KeyboardInterrupt:
+        print(f"\nInterrupted; waiting for running samples. Completed results are in {checkpoint_file}")
+        executor.shutdown(cancel_futures=True)
+        sys.exit(130)
+
+# Only samples still present and imported stay cached
+save_cache(fresh_cache)
 
 # Save results
 results_file = RESULTS_DIR / "test_results.json"
-with open(results_file, "w") as f:
-    json.dump(results, f, indent=2)
+if orjson is not None:
+    results_file.write_bytes(orjson.dumps(results, option=orjson.OPT_INDENT_2))
+else:
+    with open(results_file, "w") as f:
+        json.dump(results, f, indent=2)
 
 # Print summary
 print("\n" + "=" * 80)
 print("TESTING COMPLETE")
 print("=" * 80)
 
-imported = sum(1 for r in results if r.get("imported"))
-failed = sum(1 for r in results if not r.get("imported") and r.get("exit_code", 1) != 0)
-processed = sum(1 for r in results if r.get("exit_code") == 0 and not r.get("imported"))
-
 print(f"\nResults:")
 print(f"  ✅ Successfully imported:     {imported}")
 print(f"  ⚠️  Processed (not imported): {processed}")
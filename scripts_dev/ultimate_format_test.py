@@ -18,17 +18,268 @@ Usage:
     uv run python3 scripts/ultimate_format_test.py --skip-install
 """
 
+import hashlib
 import json
+import os
 import subprocess
 import sys
 import shutil
 import re
+import shlex
+from itertools import islice, product
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Tuple, Set
-from collections import defaultdict
+from typing import List, Dict, Tuple, Iterable, Iterator, Optional
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 import time
 
+# Rows of `ffprobe -formats`, `-codecs` and `-pix_fmts` listings, matched
+# across a whole listing at once. [^\S\n] is whitespace that stays on the
+# current line, so a match never runs into the next row.
+FORMAT_RE = re.compile(r'^[^\S\n]*((?:[DE]|[^\S\n]){2})[^\S\n]+(\S+)[^\S\n]+(.+)', re.M)
+CODEC_RE = re.compile(r'^[^\S\n]*([DEVAILS.]{6})[^\S\n]+(\S+)[^\S\n]+(.+)', re.M)
+PIX_FMT_RE = re.compile(r'^[^\S\n]*([IO.]{5})[^\S\n]+(\S+)', re.M)
+
+# Summary counts printed by smart-media-manager, e.g. "Total imported: 3"
+_STATS_RE = re.compile(r'(?P<kind>Total imported|Compatible \(no conversion\)|Refused by Apple Photos):[^\d\n]*(?P<n>\d+)')
+
+# Dashed lines separating each listing's legend from its rows
+FORMAT_SEP_RE = re.compile(r'^\s*--', re.M)
+CODEC_SEP_RE = re.compile(r'^\s*------', re.M)
+PIX_FMT_SEP_RE = re.compile(r'^\s*-----', re.M)
+
+
+# Codecs each container accepts (allow-lists) or rejects (deny-lists).
+# MKV is very flexible and unknown containers are tried with every codec.
+_WEBM_VIDEO = frozenset({'vp8', 'vp9', 'av1', 'libaom-av1', 'libvpx', 'libvpx-vp9'})
+_OGG_VIDEO = frozenset({'theora', 'libtheora'})
+_MP4_VIDEO_DENY = frozenset({'vp8', 'vp9', 'theora', 'ffv1'})
+_VIDEO_ALLOW = {'webm': _WEBM_VIDEO, 'ogg': _OGG_VIDEO, 'ogv': _OGG_VIDEO}
+_VIDEO_DENY = {
+    'avi': frozenset({'hevc', 'libx265', 'vp9', 'av1', 'libaom-av1'}),  # limited with modern codecs
+    'mp4': _MP4_VIDEO_DENY,
+    'mov': _MP4_VIDEO_DENY,
+}
+
+_OGG_AUDIO = frozenset({'vorbis', 'libvorbis', 'opus', 'libopus', 'flac'})
+_MP4_AUDIO_DENY = frozenset({'vorbis', 'libvorbis'})
+_AUDIO_ALLOW = {
+    'webm': frozenset({'libvorbis', 'vorbis', 'libopus', 'opus'}),
+    'ogg': _OGG_AUDIO,
+    'ogv': _OGG_AUDIO,
+    'oga': _OGG_AUDIO,
+}
+_AUDIO_DENY = {
+    'avi': frozenset({'opus', 'vorbis', 'flac'}),
+    'mp4': _MP4_AUDIO_DENY,
+    'mov': _MP4_AUDIO_DENY,
+}
+
+# Fastest encoder settings for the codecs that have them. Samples only need
+# to be valid files in the target format, not small or high quality ones.
+_SPEED_OPTS = {
+    'libx264': ('-preset', 'ultrafast'),
+    'libx265': ('-preset', 'ultrafast'),
+    'libvpx': ('-deadline', 'realtime', '-cpu-used', '8'),
+    'libvpx-vp9': ('-deadline', 'realtime', '-cpu-used', '8'),
+    'libaom-av1': ('-usage', 'realtime', '-cpu-used', '8'),
+}
+
+# Parsed ffprobe listings are cached per ffprobe binary, which rarely changes
+FFPROBE_CACHE_DIR = Path.home() / '.cache' / 'smart-media-manager'
+
+
+def _ffprobe_cache_file() -> Optional[Path]:
+    """Return the capabilities cache file for the ffprobe on PATH, or None if there is none.
+
+    The name hashes the resolved binary path with its size and mtime, so an
+    upgraded or different ffprobe gets a fresh cache without running it.
+    """
+    ffprobe = shutil.which('ffprobe')
+    if ffprobe is None:
+        return None
+    ffprobe = os.path.realpath(ffprobe)
+    st = os.stat(ffprobe)
+    key = hashlib.sha256(f"{ffprobe}:{st.st_size}:{st.st_mtime_ns}".encode()).hexdigest()[:16]
+    return FFPROBE_CACHE_DIR / f"ffprobe-caps-{key}.json"
+
+
+def _listing_rows(text: str, separator: re.Pattern) -> str:
+    """Return the rows of an ffprobe listing: everything after its separator line."""
+    match = separator.search(text)
+    if match is None:
+        return ''
+    end_of_line = text.find('\n', match.end())
+    return '' if end_of_line == -1 else text[end_of_line + 1:]
+
+
+def _format_row(line: str) -> Optional[Dict]:
+    """Parse one `-formats` row; None unless it is a format that can be muxed."""
+    match = FORMAT_RE.match(line)
+    if match is None or 'E' not in match[1]:
+        return None
+    return {'name': match[2], 'description': match[3].strip()}
+
+
+def _codec_row(line: str) -> Optional[Tuple[str, Dict]]:
+    """Parse one `-codecs` row into (flags, codec); None unless it can encode."""
+    match = CODEC_RE.match(line)
+    if match is None or 'E' not in match[1]:
+        return None
+    return match[1], {'name': match[2], 'description': match[3].strip()}
+
+
+def _pix_fmt_row(line: str) -> Optional[str]:
+    """Parse one `-pix_fmts` row; None unless it can be output."""
+    match = PIX_FMT_RE.match(line)
+    return match[2] if match is not None and 'O' in match[1] else None
+
+
+def _sample_fmt_row(line: str) -> Optional[str]:
+    """Return the name column of one `-sample_fmts` row, or None for headers and blanks."""
+    parts = line.split()
+    return parts[0] if parts and not parts[0].startswith('name') else None
+
+
+def _layout_row(line: str) -> Optional[str]:
+    """Return the name column of one `-layouts` row, or None for headers and blanks."""
+    parts = line.split()
+    if not parts or parts[0].startswith(('NAME', 'Individual')):
+        return None
+    return parts[0]
+
+
+# Trailing stderr kept per failed command; ffmpeg reports the error last
+GENERATION_STDERR_TAIL = 4096
+
+
+def _generate_sample(cmd_info: Dict) -> Tuple[str, Optional[Dict]]:
+    """Run one ffmpeg command.
+
+    Returns 'success' or a failure line, and for a failed ffmpeg run the
+    record to append to generation_errors.jsonl.
+    """
+    output_file = Path(cmd_info['output'])
+    try:
+        # Execute ffmpeg directly; 'command' is only its printable form
+        result = subprocess.run(
+            cmd_info['argv'],
+            capture_output=True,
+            text=True,
+            timeout=120
+        )
+
+        if result.returncode == 0 and output_file.exists():
+            return 'success', None
+
+        error = {
+            'id': cmd_info['id'],
+            'command': cmd_info['command'],
+            'exit_code': result.returncode,
+            'stderr': result.stderr[-GENERATION_STDERR_TAIL:],
+        }
+        return f"❌ Failed (exit code {result.returncode})", error
+
+    except subprocess.TimeoutExpired:
+        return "⏱️  Timeout", None
+    except Exception as e:
+        return f"❌ Error: {e}", None
+
+
+def _resolve_smm_command() -> List[str]:
+    """Return the argv prefix that starts smart-media-manager.
+
+    `uv run` checks and syncs the project environment before every launch.
+    The console script it would start is resolved once here and then run
+    directly, falling back to `uv run` if it cannot be found.
+    """
+    try:
+        result = subprocess.run(
+            ['uv', 'run', 'python', '-c', "import shutil; print(shutil.which('smart-media-manager') or '')"],
+            capture_output=True,
+            text=True,
+            timeout=120
+        )
+        script = result.stdout.strip()
+        if result.returncode == 0 and os.path.isfile(script) and os.access(script, os.X_OK):
+            return [script]
+    except (OSError, subprocess.TimeoutExpired):
+        pass
+    return ['uv', 'run', 'smart-media-manager']
+
+
+def _test_sample(entry: os.DirEntry, results_dir: Path, smm_cmd: List[str]) -> Dict:
+    """Test one sample with Smart Media Manager and save its log."""
+    test_file = Path(entry.path)
+    result = {
+        'file': entry.name,
+        'size': entry.stat().st_size,  # cached on the DirEntry
+        'extension': test_file.suffix,
+        'timestamp': datetime.now().isoformat(),
+    }
+
+    # Run smart-media-manager
+    cmd = [
+        *smm_cmd,
+        str(test_file),
+        '--file',
+        '--skip-renaming',
+        '--skip-convert',
+        '--skip-compatibility-check',
+    ]
+
+    try:
+        proc = subprocess.run(
+            cmd,
+            capture_output=True,
+            text=True,
+            timeout=180
+        )
+
+        # Full stdout/stderr go only to the per-sample log; results keep scalars
+        result['exit_code'] = proc.returncode
+
+        # Parse import status from the summary counts; the first count on a
+        # line after each label wins, as the three separate searches did
+        counts = {}
+        for match in _STATS_RE.finditer(proc.stdout):
+            counts.setdefault(match['kind'], int(match['n']))
+        result['imported'] = counts.get('Total imported', 0) > 0
+        result['compatible'] = counts.get('Compatible (no conversion)', 0) > 0
+        result['refused'] = counts.get('Refused by Apple Photos', 0) > 0
+
+        # Save individual log
+        log_file = results_dir / f"{test_file.stem}.log"
+        with open(log_file, 'w') as f:
+            f.write(f"Test file: {test_file}\n")
+            f.write(f"Command: {' '.join(cmd)}\n")
+            f.write(f"\n=== STDOUT ===\n{proc.stdout}\n")
+            f.write(f"\n=== STDERR ===\n{proc.stderr}\n")
+            f.write(f"\n=== EXIT CODE ===\n{proc.returncode}\n")
+
+        result['log_file'] = str(log_file)
+
+    except subprocess.TimeoutExpired:
+        result['error'] = 'timeout'
+        result['imported'] = False
+    except Exception as e:
+        result['error'] = str(e)
+        result['imported'] = False
+
+    return result
+
+
+def _start_script(script: str) -> subprocess.Popen:
+    """Start `uv run python3 <script>` in the current directory.
+
+    uv is given by absolute path and file descriptors are inherited (Python
+    opens its own as non-inheritable anyway), which lets subprocess start it
+    with posix_spawn rather than fork + exec.
+    """
+    uv = shutil.which('uv') or 'uv'
+    return subprocess.Popen([uv, 'run', 'python3', script], close_fds=False)
+
+
 class UltimateFormatTester:
     def __init__(self, base_video: str, base_image: str, output_dir: str, results_dir: str):
         self.base_video = Path(base_video)
@@ -51,7 +302,6 @@ class UltimateFormatTester:
         self.layouts: List[str] = []
 
         # Results
-        self.commands: List[Dict] = []
         self.results: List[Dict] = []
         self.stats = {
             'total_commands': 0,
@@ -113,29 +363,36 @@ class UltimateFormatTester:
         print("DISCOVERING FORMATS WITH FFPROBE")
         print("="*80)
 
+        # Only listings that discover_all_formats parses; -formats already
+        # carries the mux/demux flags that -muxers/-demuxers would list
         queries = {
             'formats': '-formats',
-            'muxers': '-muxers',
-            'demuxers': '-demuxers',
             'codecs': '-codecs',
             'pix_fmts': '-pix_fmts',
             'layouts': '-layouts',
             'sample_fmts': '-sample_fmts',
-            'dispositions': '-dispositions'
         }
 
+        def run_query(flag: str) -> str:
+            result = subprocess.run(
+                ['ffprobe', flag],
+                capture_output=True,
+                text=True,
+                timeout=30
+            )
+            return result.stdout + result.stderr
+
+        # Each query is a separate ffprobe process, so they all run at once
+        # and discovery takes as long as the slowest one
+        with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+            futures = {name: executor.submit(run_query, flag) for name, flag in queries.items()}
+
         outputs = {}
 
         for name, flag in queries.items():
             print(f"Running: ffprobe {flag}")
             try:
-                result = subprocess.run(
-                    ['ffprobe', flag],
-                    capture_output=True,
-                    text=True,
-                    timeout=30
-                )
-                outputs[name] = result.stdout + result.stderr
+                outputs[name] = futures[name].result()
                 print(f"  ✅ Captured {len(outputs[name])} characters")
             except Exception as e:
                 print(f"  ❌ Failed: {e}")
@@ -145,93 +402,39 @@ class UltimateFormatTester:
 
     def parse_formats_from_text(self, text: str) -> List[Dict]:
         """Parse formats/muxers from text output."""
-        formats = []
-        lines = text.split('\n')
-        started = False
-
-        for line in lines:
-            if line.strip().startswith('--'):
-                started = True
-                continue
-            if started and line.strip():
-                # Format: " D. matroska        Matroska / WebM"
-                match = re.match(r'\s*([DE\s]{2})\s+(\S+)\s+(.+)', line)
-                if match:
-                    flags, name, description = match.groups()
-                    if 'E' in flags:  # Can encode
-                        formats.append({
-                            'name': name.strip(),
-                            'description': description.strip()
-                        })
-        return formats
+        # Format: " D. matroska        Matroska / WebM"
+        return [
+            {'name': name, 'description': description.strip()}
+            for flags, name, description in FORMAT_RE.findall(_listing_rows(text, FORMAT_SEP_RE))
+            if 'E' in flags  # Can encode
+        ]
 
     def parse_codecs_from_text(self, text: str, codec_type: str) -> List[Dict]:
         """Parse video or audio codecs from text output."""
-        codecs = []
-        lines = text.split('\n')
-        started = False
-
-        for line in lines:
-            if line.strip().startswith('------'):
-                started = True
-                continue
-            if started and line.strip():
-                # Format: " DEV.L. h264                 H.264 / AVC / MPEG-4 AVC / MPEG-4 part 10"
-                match = re.match(r'\s*([DEVAILS\.]{6})\s+(\S+)\s+(.+)', line)
-                if match:
-                    flags, name, description = match.groups()
-                    type_flag = 'V' if codec_type == 'video' else 'A'
-                    if type_flag in flags and 'E' in flags:  # Can encode
-                        codecs.append({
-                            'name': name.strip(),
-                            'description': description.strip()
-                        })
-        return codecs
+        type_flag = 'V' if codec_type == 'video' else 'A'
+        # Format: " DEV.L. h264                 H.264 / AVC / MPEG-4 AVC / MPEG-4 part 10"
+        return [
+            {'name': name, 'description': description.strip()}
+            for flags, name, description in CODEC_RE.findall(_listing_rows(text, CODEC_SEP_RE))
+            if type_flag in flags and 'E' in flags  # Can encode
+        ]
 
     def parse_pix_fmts_from_text(self, text: str) -> List[str]:
         """Parse pixel formats from text output."""
-        pix_fmts = []
-        lines = text.split('\n')
-        started = False
-
-        for line in lines:
-            if line.strip().startswith('-----'):
-                started = True
-                continue
-            if started and line.strip():
-                # Format: "IO... yuv420p                3            12"
-                match = re.match(r'\s*([IO\.]{5})\s+(\S+)', line)
-                if match:
-                    flags, name = match.groups()
-                    if 'O' in flags:  # Can output
-                        pix_fmts.append(name.strip())
-        return pix_fmts
+        # Format: "IO... yuv420p                3            12"
+        return [
+            name
+            for flags, name in PIX_FMT_RE.findall(_listing_rows(text, PIX_FMT_SEP_RE))
+            if 'O' in flags  # Can output
+        ]
 
     def parse_sample_fmts_from_text(self, text: str) -> List[str]:
         """Parse audio sample formats from text output."""
-        sample_fmts = []
-        lines = text.split('\n')
-
-        for line in lines:
-            line = line.strip()
-            if line and not line.startswith('name'):
-                parts = line.split()
-                if parts:
-                    sample_fmts.append(parts[0])
-        return sample_fmts
+        return [name for name in map(_sample_fmt_row, text.split('\n')) if name is not None]
 
     def parse_layouts_from_text(self, text: str) -> List[str]:
         """Parse channel layouts from text output."""
-        layouts = []
-        lines = text.split('\n')
-
-        for line in lines:
-            line = line.strip()
-            if line and not line.startswith('NAME') and not line.startswith('Individual'):
-                parts = line.split()
-                if parts:
-                    layouts.append(parts[0])
-        return layouts
+        return [name for name in map(_layout_row, text.split('\n')) if name is not None]
 
     def load_extra_formats(self):
         """Load extra formats from custom file."""
@@ -245,46 +448,51 @@ class UltimateFormatTester:
 
         print(f"Loading: {self.extra_formats_file}")
 
-        with open(self.extra_formats_file) as f:
-            text = f.read()
-
-        # Parse different sections
-        formats_text = ""
-        codecs_text = ""
-        pix_fmts_text = ""
-        sample_fmts_text = ""
-        layouts_text = ""
+        extra_formats: List[Dict] = []
+        extra_video_codecs: List[Dict] = []
+        extra_audio_codecs: List[Dict] = []
+        extra_pix_fmts: List[str] = []
+        extra_sample_fmts: List[str] = []
+        extra_layouts: List[str] = []
+
+        # Section header markers, and the row parser and list for each
+        # section's rows; codec rows go to the list for their type flag
+        section_headers = {
+            '===== FORMATS/MUXERS =====': 'formats',
+            '===== CODECS =====': 'codecs',
+            '===== PIXEL FORMATS =====': 'pix_fmts',
+            '===== SAMPLE FORMATS =====': 'sample_fmts',
+            '===== CHANNEL LAYOUTS =====': 'layouts',
+        }
+        row_parsers = {
+            'formats': (_format_row, extra_formats),
+            'pix_fmts': (_pix_fmt_row, extra_pix_fmts),
+            'sample_fmts': (_sample_fmt_row, extra_sample_fmts),
+            'layouts': (_layout_row, extra_layouts),
+        }
+        codec_lists = {'V': extra_video_codecs, 'A': extra_audio_codecs}
 
+        # Parse every row as its section is read, in a single pass. Separator
+        # lines match none of the row parsers.
         current_section = None
-        for line in text.split('\n'):
-            if '===== FORMATS/MUXERS =====' in line:
-                current_section = 'formats'
-            elif '===== CODECS =====' in line:
-                current_section = 'codecs'
-            elif '===== PIXEL FORMATS =====' in line:
-                current_section = 'pix_fmts'
-            elif '===== SAMPLE FORMATS =====' in line:
-                current_section = 'sample_fmts'
-            elif '===== CHANNEL LAYOUTS =====' in line:
-                current_section = 'layouts'
-            elif not line.startswith('#') and line.strip():
-                if current_section == 'formats':
-                    formats_text += line + '\n'
-                elif current_section == 'codecs':
-                    codecs_text += line + '\n'
-                elif current_section == 'pix_fmts':
-                    pix_fmts_text += line + '\n'
-                elif current_section == 'sample_fmts':
-                    sample_fmts_text += line + '\n'
-                elif current_section == 'layouts':
-                    layouts_text += line + '\n'
-
-        extra_formats = self.parse_formats_from_text(formats_text)
-        extra_video_codecs = self.parse_codecs_from_text(codecs_text, 'video')
-        extra_audio_codecs = self.parse_codecs_from_text(codecs_text, 'audio')
-        extra_pix_fmts = self.parse_pix_fmts_from_text(pix_fmts_text)
-        extra_sample_fmts = self.parse_sample_fmts_from_text(sample_fmts_text)
-        extra_layouts = self.parse_layouts_from_text(layouts_text)
+        for line in self.extra_formats_file.read_text().splitlines():
+            header = next((name for marker, name in section_headers.items() if marker in line), None)
+            if header is not None:
+                current_section = header
+            elif current_section is None or line.startswith('#') or not line.strip():
+                continue
+            elif current_section == 'codecs':
+                row = _codec_row(line)
+                if row is not None:
+                    flags, codec = row
+                    for type_flag, codecs in codec_lists.items():
+                        if type_flag in flags:
+                            codecs.append(codec)
+            else:
+                parse_row, items = row_parsers[current_section]
+                item = parse_row(line)
+                if item is not None:
+                    items.append(item)
 
         print(f"  ✅ Loaded {len(extra_formats)} extra formats")
         print(f"  ✅ Loaded {len(extra_video_codecs)} extra video codecs")
@@ -301,52 +509,69 @@ class UltimateFormatTester:
         print("DEDUPLICATING FORMATS")
         print("="*80)
 
-        # Deduplicate formats by name
-        formats_dict = {}
-        for fmt in self.formats:
-            formats_dict[fmt['name']] = fmt
-        self.formats = list(formats_dict.values())
+        # Deduplicate formats by name (first position, last entry wins)
+        self.formats = list({fmt['name']: fmt for fmt in self.formats}.values())
         print(f"  Formats: {len(self.formats)} unique")
 
         # Deduplicate video codecs
-        video_dict = {}
-        for codec in self.video_codecs:
-            video_dict[codec['name']] = codec
-        self.video_codecs = list(video_dict.values())
+        self.video_codecs = list({codec['name']: codec for codec in self.video_codecs}.values())
         print(f"  Video codecs: {len(self.video_codecs)} unique")
 
         # Deduplicate audio codecs
-        audio_dict = {}
-        for codec in self.audio_codecs:
-            audio_dict[codec['name']] = codec
-        self.audio_codecs = list(audio_dict.values())
+        self.audio_codecs = list({codec['name']: codec for codec in self.audio_codecs}.values())
         print(f"  Audio codecs: {len(self.audio_codecs)} unique")
 
-        # Deduplicate pixel formats
-        self.pix_fmts = list(set(self.pix_fmts))
+        # Deduplicate pixel formats, keeping discovery order so reruns
+        # generate the same commands (and output names) every time
+        self.pix_fmts = list(dict.fromkeys(self.pix_fmts))
         print(f"  Pixel formats: {len(self.pix_fmts)} unique")
 
         # Deduplicate sample formats
-        self.sample_fmts = list(set(self.sample_fmts))
+        self.sample_fmts = list(dict.fromkeys(self.sample_fmts))
         print(f"  Sample formats: {len(self.sample_fmts)} unique")
 
         # Deduplicate layouts
-        self.layouts = list(set(self.layouts))
+        self.layouts = list(dict.fromkeys(self.layouts))
         print(f"  Layouts: {len(self.layouts)} unique")
 
     def discover_all_formats(self):
         """Main format discovery orchestration."""
-        # Run ffprobe
-        outputs = self.run_ffprobe_queries()
-
-        # Parse ffprobe outputs
-        print("\nParsing ffprobe outputs...")
-        self.formats = self.parse_formats_from_text(outputs['formats'])
-        self.video_codecs = self.parse_codecs_from_text(outputs['codecs'], 'video')
-        self.audio_codecs = self.parse_codecs_from_text(outputs['codecs'], 'audio')
-        self.pix_fmts = self.parse_pix_fmts_from_text(outputs['pix_fmts'])
-        self.sample_fmts = self.parse_sample_fmts_from_text(outputs['sample_fmts'])
-        self.layouts = self.parse_layouts_from_text(outputs['layouts'])
+        cache_file = _ffprobe_cache_file()
+        try:
+            caps = json.loads(cache_file.read_text()) if cache_file else None
+        except (OSError, ValueError):
+            caps = None
+
+        if caps is not None:
+            print(f"\nUsing cached ffprobe capabilities: {cache_file}")
+        else:
+            # Run ffprobe
+            outputs = self.run_ffprobe_queries()
+
+            # Parse ffprobe outputs
+            print("\nParsing ffprobe outputs...")
+            caps = {
+                'formats': self.parse_formats_from_text(outputs['formats']),
+                'video_codecs': self.parse_codecs_from_text(outputs['codecs'], 'video'),
+                'audio_codecs': self.parse_codecs_from_text(outputs['codecs'], 'audio'),
+                'pix_fmts': self.parse_pix_fmts_from_text(outputs['pix_fmts']),
+                'sample_fmts': self.parse_sample_fmts_from_text(outputs['sample_fmts']),
+                'layouts': self.parse_layouts_from_text(outputs['layouts']),
+            }
+
+            # Only a complete discovery is worth reusing
+            if cache_file and all(outputs.values()):
+                cache_file.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = cache_file.with_suffix('.tmp')
+                tmp_path.write_text(json.dumps(caps))
+                os.replace(tmp_path, cache_file)
+
+        self.formats = caps['formats']
+        self.video_codecs = caps['video_codecs']
+        self.audio_codecs = caps['audio_codecs']
+        self.pix_fmts = caps['pix_fmts']
+        self.sample_fmts = caps['sample_fmts']
+        self.layouts = caps['layouts']
 
         print(f"  ffprobe formats: {len(self.formats)}")
         print(f"  ffprobe video codecs: {len(self.video_codecs)}")
@@ -371,51 +596,22 @@ class UltimateFormatTester:
 
     def is_video_compatible_with_container(self, container: str, video_codec: str) -> bool:
         """Check if video codec is compatible with container."""
-        # WebM only supports VP8/VP9/AV1
-        if container == 'webm':
-            return video_codec in ['vp8', 'vp9', 'av1', 'libaom-av1', 'libvpx', 'libvpx-vp9']
-
-        # AVI has limitations with modern codecs
-        if container == 'avi':
-            return video_codec not in ['hevc', 'libx265', 'vp9', 'av1', 'libaom-av1']
-
-        # MP4/MOV skip exotic codecs
-        if container in ['mp4', 'mov']:
-            return video_codec not in ['vp8', 'vp9', 'theora', 'ffv1']
-
-        # OGG/OGV only support Theora
-        if container in ['ogg', 'ogv']:
-            return video_codec in ['theora', 'libtheora']
-
-        # MKV is very flexible, accept most
-        # For unknown containers, try it
-        return True
+        allowed = _VIDEO_ALLOW.get(container)
+        if allowed is not None:
+            return video_codec in allowed
+        denied = _VIDEO_DENY.get(container)
+        return denied is None or video_codec not in denied
 
     def is_audio_compatible_with_container(self, container: str, audio_codec: str) -> bool:
         """Check if audio codec is compatible with container."""
-        # WebM only supports Vorbis/Opus
-        if container == 'webm':
-            return audio_codec in ['libvorbis', 'vorbis', 'libopus', 'opus']
-
-        # AVI has limitations
-        if container == 'avi':
-            return audio_codec not in ['opus', 'vorbis', 'flac']
-
-        # MP4/MOV prefer common codecs
-        if container in ['mp4', 'mov']:
-            # Skip very exotic
-            return audio_codec not in ['vorbis', 'libvorbis']
-
-        # OGG/OGV only support Vorbis/Opus/FLAC
-        if container in ['ogg', 'ogv', 'oga']:
-            return audio_codec in ['vorbis', 'libvorbis', 'opus', 'libopus', 'flac']
+        allowed = _AUDIO_ALLOW.get(container)
+        if allowed is not None:
+            return audio_codec in allowed
+        denied = _AUDIO_DENY.get(container)
+        return denied is None or audio_codec not in denied
 
-        # MKV is very flexible
-        # For unknown containers, try it
-        return True
-
-    def generate_all_commands(self, max_samples: int = None):
-        """Generate all format conversion commands.
+    def iter_commands(self, max_samples: int = None) -> Iterator[Dict]:
+        """Yield all format conversion commands, one at a time.
 
         Uses independent testing approach:
         - Container + Video Codec (with default audio)
@@ -428,13 +624,15 @@ class UltimateFormatTester:
         - Audio codec support is independent of video codec
         - Both depend on container format
         """
-        print("\n" + "="*80)
-        print("GENERATING FORMAT CONVERSION COMMANDS")
-        print("="*80)
-
-        commands = []
         cmd_id = 0
 
+        def remaining() -> Optional[int]:
+            """Commands still allowed under max_samples; None means no limit."""
+            return max_samples - cmd_id if max_samples else None
+
+        # Output paths are built as plain strings under this prefix
+        out_dir = str(self.output_dir) + os.sep
+
         # Use ALL discovered formats (not just priority)
         containers = self.formats
         video_codecs = self.video_codecs
@@ -448,154 +646,139 @@ class UltimateFormatTester:
         print(f"  Sample formats: {len(self.sample_fmts)}")
         print(f"  Layouts: {len(self.layouts)}")
 
+        # Compatible (container, codec) name pairs, filtered once up front so
+        # tests 1 and 2 are straight passes over them
+        video_pairs = [
+            (container['name'], video_codec['name'])
+            for container in containers
+            for video_codec in video_codecs
+            if self.is_video_compatible_with_container(container['name'], video_codec['name'])
+        ]
+        audio_pairs = [
+            (container['name'], audio_codec['name'])
+            for container in containers
+            for audio_codec in audio_codecs
+            if self.is_audio_compatible_with_container(container['name'], audio_codec['name'])
+        ]
+
         # Test 1: Container + Video Codec (independent of audio)
         # Use AAC as default audio since it's widely supported
-        print(f"\n1. Testing Container + Video Codec combinations:")
-        for container in containers:
-            if max_samples and len(commands) >= max_samples:
-                break
-            for video_codec in video_codecs:
-                if max_samples and len(commands) >= max_samples:
-                    break
-
-                # Check container-video compatibility
-                if not self.is_video_compatible_with_container(container['name'], video_codec['name']):
-                    continue
-
-                cmd_id += 1
-                output_name = f"test_{cmd_id:04d}_{container['name']}_video_{video_codec['name']}.{container['name']}"
-                output_path = self.output_dir / output_name
-
-                # Use AAC as default audio (widely supported)
-                command = (
-                    f"ffmpeg -y -i {self.base_video} "
-                    f"-c:v {video_codec['name']} -c:a aac "
-                    f"-t 5 -map_metadata 0 {output_path}"
-                )
+        print(f"\n1. Testing Container + Video Codec combinations ({len(video_pairs)} compatible):")
+        for container, video_codec in islice(video_pairs, remaining()):
+            cmd_id += 1
+            output = f"{out_dir}test_{cmd_id:04d}_{container}_video_{video_codec}.{container}"
+
+            # Use AAC as default audio (widely supported)
+            argv = [
+                'ffmpeg', '-y', '-i', str(self.base_video), '-threads', '0',
+                '-c:v', video_codec, *_SPEED_OPTS.get(video_codec, ()), '-c:a', 'aac',
+                '-t', '5', '-map_metadata', '0', output,
+            ]
 
-                commands.append({
-                    'id': cmd_id,
-                    'type': 'container_video',
-                    'container': container['name'],
-                    'video_codec': video_codec['name'],
-                    'audio_codec': 'aac',
-                    'command': command,
-                    'output': str(output_path),
-                    'description': f"{container['name'].upper()} + {video_codec['name']} video codec"
-                })
+            yield {
+                'id': cmd_id,
+                'type': 'container_video',
+                'container': container,
+                'video_codec': video_codec,
+                'audio_codec': 'aac',
+                'argv': argv,
+                'command': shlex.join(argv),
+                'output': output,
+                'description': f"{container.upper()} + {video_codec} video codec"
+            }
 
         # Test 2: Container + Audio Codec (independent of video)
         # Use H.264 as default video since it's universally supported
-        print(f"2. Testing Container + Audio Codec combinations:")
-        for container in containers:
-            if max_samples and len(commands) >= max_samples:
-                break
-            for audio_codec in audio_codecs:
-                if max_samples and len(commands) >= max_samples:
-                    break
-
-                # Check container-audio compatibility
-                if not self.is_audio_compatible_with_container(container['name'], audio_codec['name']):
-                    continue
-
-                cmd_id += 1
-                output_name = f"test_{cmd_id:04d}_{container['name']}_audio_{audio_codec['name']}.{container['name']}"
-                output_path = self.output_dir / output_name
-
-                # Use H.264 as default video (universally supported)
-                command = (
-                    f"ffmpeg -y -i {self.base_video} "
-                    f"-c:v libx264 -c:a {audio_codec['name']} "
-                    f"-t 5 -map_metadata 0 {output_path}"
-                )
+        print(f"2. Testing Container + Audio Codec combinations ({len(audio_pairs)} compatible):")
+        for container, audio_codec in islice(audio_pairs, remaining()):
+            cmd_id += 1
+            output = f"{out_dir}test_{cmd_id:04d}_{container}_audio_{audio_codec}.{container}"
+
+            # Use H.264 as default video (universally supported)
+            argv = [
+                'ffmpeg', '-y', '-i', str(self.base_video), '-threads', '0',
+                '-c:v', 'libx264', *_SPEED_OPTS['libx264'], '-c:a', audio_codec,
+                '-t', '5', '-map_metadata', '0', output,
+            ]
 
-                commands.append({
-                    'id': cmd_id,
-                    'type': 'container_audio',
-                    'container': container['name'],
-                    'video_codec': 'libx264',
-                    'audio_codec': audio_codec['name'],
-                    'command': command,
-                    'output': str(output_path),
-                    'description': f"{container['name'].upper()} + {audio_codec['name']} audio codec"
-                })
+            yield {
+                'id': cmd_id,
+                'type': 'container_audio',
+                'container': container,
+                'video_codec': 'libx264',
+                'audio_codec': audio_codec,
+                'argv': argv,
+                'command': shlex.join(argv),
+                'output': output,
+                'description': f"{container.upper()} + {audio_codec} audio codec"
+            }
 
         # Test 3: Video Codec + Pixel Format (independent of container)
         # Pixel formats depend on video codec, not container
         # Test with MP4 container and AAC audio as baseline
-        if not max_samples or len(commands) < max_samples:
+        if not max_samples or cmd_id < max_samples:
             print(f"3. Testing Video Codec + Pixel Format combinations:")
             # Test a subset of common video codecs with all pixel formats
             common_video_codecs = ['libx264', 'libx265', 'libvpx', 'libvpx-vp9', 'av1']
             test_video_codecs = [c for c in video_codecs if c['name'] in common_video_codecs]
 
-            for video_codec in test_video_codecs:
-                if max_samples and len(commands) >= max_samples:
-                    break
-                for pix_fmt in self.pix_fmts:
-                    if max_samples and len(commands) >= max_samples:
-                        break
-
-                    cmd_id += 1
-                    output_name = f"test_{cmd_id:04d}_video_{video_codec['name']}_pixfmt_{pix_fmt}.mp4"
-                    output_path = self.output_dir / output_name
-
-                    command = (
-                        f"ffmpeg -y -i {self.base_video} "
-                        f"-c:v {video_codec['name']} -pix_fmt {pix_fmt} -c:a aac "
-                        f"-t 5 {output_path}"
-                    )
-
-                    commands.append({
-                        'id': cmd_id,
-                        'type': 'video_pixfmt',
-                        'video_codec': video_codec['name'],
-                        'pix_fmt': pix_fmt,
-                        'command': command,
-                        'output': str(output_path),
-                        'description': f"{video_codec['name']} + {pix_fmt} pixel format"
-                    })
+            for video_codec, pix_fmt in islice(product(test_video_codecs, self.pix_fmts), remaining()):
+                cmd_id += 1
+                output = f"{out_dir}test_{cmd_id:04d}_video_{video_codec['name']}_pixfmt_{pix_fmt}.mp4"
+
+                argv = [
+                    'ffmpeg', '-y', '-i', str(self.base_video), '-threads', '0',
+                    '-c:v', video_codec['name'], *_SPEED_OPTS.get(video_codec['name'], ()),
+                    '-pix_fmt', pix_fmt, '-c:a', 'aac',
+                    '-t', '5', output,
+                ]
+
+                yield {
+                    'id': cmd_id,
+                    'type': 'video_pixfmt',
+                    'video_codec': video_codec['name'],
+                    'pix_fmt': pix_fmt,
+                    'argv': argv,
+                    'command': shlex.join(argv),
+                    'output': output,
+                    'description': f"{video_codec['name']} + {pix_fmt} pixel format"
+                }
 
         # Test 4: Audio Codec + Sample Format (independent of container)
         # Sample formats depend on audio codec, not container
         # Test with MP4 container and H.264 video as baseline
-        if not max_samples or len(commands) < max_samples:
+        if not max_samples or cmd_id < max_samples:
             print(f"4. Testing Audio Codec + Sample Format combinations:")
             # Test a subset of common audio codecs with all sample formats
             common_audio_codecs = ['aac', 'mp3', 'libopus', 'libvorbis', 'flac']
             test_audio_codecs = [c for c in audio_codecs if c['name'] in common_audio_codecs]
 
-            for audio_codec in test_audio_codecs:
-                if max_samples and len(commands) >= max_samples:
-                    break
-                for sample_fmt in self.sample_fmts:
-                    if max_samples and len(commands) >= max_samples:
-                        break
-
-                    cmd_id += 1
-                    output_name = f"test_{cmd_id:04d}_audio_{audio_codec['name']}_samplefmt_{sample_fmt}.mp4"
-                    output_path = self.output_dir / output_name
-
-                    command = (
-                        f"ffmpeg -y -i {self.base_video} "
-                        f"-c:v libx264 -c:a {audio_codec['name']} -sample_fmt {sample_fmt} "
-                        f"-t 5 {output_path}"
-                    )
-
-                    commands.append({
-                        'id': cmd_id,
-                        'type': 'audio_samplefmt',
-                        'audio_codec': audio_codec['name'],
-                        'sample_fmt': sample_fmt,
-                        'command': command,
-                        'output': str(output_path),
-                        'description': f"{audio_codec['name']} + {sample_fmt} sample format"
-                    })
+            for audio_codec, sample_fmt in islice(product(test_audio_codecs, self.sample_fmts), remaining()):
+                cmd_id += 1
+                output = f"{out_dir}test_{cmd_id:04d}_audio_{audio_codec['name']}_samplefmt_{sample_fmt}.mp4"
+
+                argv = [
+                    'ffmpeg', '-y', '-i', str(self.base_video), '-threads', '0',
+                    '-c:v', 'libx264', *_SPEED_OPTS['libx264'],
+                    '-c:a', audio_codec['name'], '-sample_fmt', sample_fmt,
+                    '-t', '5', output,
+                ]
+
+                yield {
+                    'id': cmd_id,
+                    'type': 'audio_samplefmt',
+                    'audio_codec': audio_codec['name'],
+                    'sample_fmt': sample_fmt,
+                    'argv': argv,
+                    'command': shlex.join(argv),
+                    'output': output,
+                    'description': f"{audio_codec['name']} + {sample_fmt} sample format"
+                }
 
         # Test 5: Audio Codec + Channel Layout (independent of container)
         # Channel layouts depend on audio codec, not container
         # Test with MP4 container and H.264 video as baseline
-        if not max_samples or len(commands) < max_samples:
+        if not max_samples or cmd_id < max_samples:
             print(f"5. Testing Audio Codec + Channel Layout combinations:")
             common_audio_codecs = ['aac', 'mp3', 'libopus', 'ac3', 'eac3']
             test_audio_codecs = [c for c in audio_codecs if c['name'] in common_audio_codecs]
@@ -604,35 +787,30 @@ class UltimateFormatTester:
             common_layouts = ['mono', 'stereo', '2.1', '5.1', '5.1(side)', '7.1']
             test_layouts = [l for l in self.layouts if l in common_layouts]
 
-            for audio_codec in test_audio_codecs:
-                if max_samples and len(commands) >= max_samples:
-                    break
-                for layout in test_layouts:
-                    if max_samples and len(commands) >= max_samples:
-                        break
-
-                    cmd_id += 1
-                    output_name = f"test_{cmd_id:04d}_audio_{audio_codec['name']}_layout_{layout.replace('.', '_')}.mp4"
-                    output_path = self.output_dir / output_name
-
-                    command = (
-                        f"ffmpeg -y -i {self.base_video} "
-                        f"-c:v libx264 -c:a {audio_codec['name']} -channel_layout {layout} "
-                        f"-t 5 {output_path}"
-                    )
-
-                    commands.append({
-                        'id': cmd_id,
-                        'type': 'audio_layout',
-                        'audio_codec': audio_codec['name'],
-                        'channel_layout': layout,
-                        'command': command,
-                        'output': str(output_path),
-                        'description': f"{audio_codec['name']} + {layout} channel layout"
-                    })
+            for audio_codec, layout in islice(product(test_audio_codecs, test_layouts), remaining()):
+                cmd_id += 1
+                output = f"{out_dir}test_{cmd_id:04d}_audio_{audio_codec['name']}_layout_{layout.replace('.', '_')}.mp4"
+
+                argv = [
+                    'ffmpeg', '-y', '-i', str(self.base_video), '-threads', '0',
+                    '-c:v', 'libx264', *_SPEED_OPTS['libx264'],
+                    '-c:a', audio_codec['name'], '-channel_layout', layout,
+                    '-t', '5', output,
+                ]
+
+                yield {
+                    'id': cmd_id,
+                    'type': 'audio_layout',
+                    'audio_codec': audio_codec['name'],
+                    'channel_layout': layout,
+                    'argv': argv,
+                    'command': shlex.join(argv),
+                    'output': output,
+                    'description': f"{audio_codec['name']} + {layout} channel layout"
+                }
 
         # Test 6: Image format variations (ALL image containers)
-        if not max_samples or len(commands) < max_samples:
+        if not max_samples or cmd_id < max_samples:
             print(f"6. Testing Image Format variations:")
             # Map image containers to their codecs
             image_format_map = {
@@ -649,90 +827,132 @@ class UltimateFormatTester:
             }
 
             # Test all container formats that look like images
-            for container in self.formats:
-                if max_samples and len(commands) >= max_samples:
-                    break
-
-                ext = container['name']
-                if ext in image_format_map:
-                    cmd_id += 1
-                    output_name = f"test_{cmd_id:04d}_image_{ext}.{ext}"
-                    output_path = self.output_dir / output_name
-
-                    codec = image_format_map[ext]
-                    command = f"ffmpeg -y -i {self.base_image} -c:v {codec} {output_path}"
-
-                    commands.append({
-                        'id': cmd_id,
-                        'type': 'image',
-                        'format': ext,
-                        'codec': codec,
-                        'command': command,
-                        'output': str(output_path),
-                        'description': f"Image format: {ext.upper()}"
-                    })
-
-        self.commands = commands
-        self.stats['total_commands'] = len(commands)
-
-        print(f"\n✅ Generated {len(commands)} commands")
-        print(f"   - Container + Video: {sum(1 for c in commands if c['type'] == 'container_video')}")
-        print(f"   - Container + Audio: {sum(1 for c in commands if c['type'] == 'container_audio')}")
-        print(f"   - Video + Pixel fmt: {sum(1 for c in commands if c['type'] == 'video_pixfmt')}")
-        print(f"   - Audio + Sample fmt: {sum(1 for c in commands if c['type'] == 'audio_samplefmt')}")
-        print(f"   - Audio + Layout: {sum(1 for c in commands if c['type'] == 'audio_layout')}")
-        print(f"   - Image formats: {sum(1 for c in commands if c['type'] == 'image')}")
-        return commands
-
-    def step2_generate_samples(self, skip_existing: bool = True):
-        """Step 2: Execute ffmpeg commands to generate test samples."""
+            image_formats = [container['name'] for container in self.formats if container['name'] in image_format_map]
+            for ext in islice(image_formats, remaining()):
+                cmd_id += 1
+                output = f"{out_dir}test_{cmd_id:04d}_image_{ext}.{ext}"
+
+                codec = image_format_map[ext]
+                argv = ['ffmpeg', '-y', '-i', str(self.base_image), '-threads', '0', '-c:v', codec, output]
+
+                yield {
+                    'id': cmd_id,
+                    'type': 'image',
+                    'format': ext,
+                    'codec': codec,
+                    'argv': argv,
+                    'command': shlex.join(argv),
+                    'output': output,
+                    'description': f"Image format: {ext.upper()}"
+                }
+
+    def step2_generate_samples(self, commands: Iterable[Dict], skip_existing: bool = True):
+        """Step 2: Execute ffmpeg commands to generate test samples.
+
+        Commands are consumed as they are produced, and each outcome is
+        appended to manifest.jsonl in the results directory. Samples the
+        manifest records as generated are skipped when the run is restarted.
+        """
         print("\n" + "="*80)
         print("STEP 2: GENERATING TEST SAMPLES")
         print("="*80)
 
-        total = len(self.commands)
-        print(f"\nGenerating {total} samples...")
+        # With a manifest, only samples it records as generated are skipped:
+        # an existing file it does not list may be left over from an
+        # interrupted ffmpeg. Without one, any existing sample is skipped.
+        manifest_file = self.results_dir / 'manifest.jsonl'
+        generated = None
+        if skip_existing and manifest_file.exists():
+            generated = set()
+            with open(manifest_file) as f:
+                for line in f:
+                    entry = json.loads(line)
+                    if entry['status'] == 'success':
+                        generated.add((entry['id'], entry['output']))
+
+        # Names of the samples already on disk, from one directory read
+        # rather than a stat per command
+        existing = set()
+        if skip_existing:
+            with os.scandir(self.output_dir) as it:
+                existing = {entry.name for entry in it if entry.is_file()}
+
+        type_counts = {
+            'container_video': 0,
+            'container_audio': 0,
+            'video_pixfmt': 0,
+            'audio_samplefmt': 0,
+            'audio_layout': 0,
+            'image': 0,
+        }
 
-        for i, cmd_info in enumerate(self.commands, 1):
-            output_file = Path(cmd_info['output'])
+        # Each job spends its time inside ffmpeg, so threads are enough to keep
+        # one encode running per core. Only a few jobs per worker are queued
+        # ahead, and progress is reported as jobs finish.
+        max_workers = os.cpu_count() or 1
+        # Failed ffmpeg runs are appended to one JSONL file, written from this
+        # thread only
+        errors_file = self.results_dir / 'generation_errors.jsonl'
+        with (
+            ThreadPoolExecutor(max_workers=max_workers) as executor,
+            open(manifest_file, 'a') as manifest,
+            open(errors_file, 'a') as errors,
+        ):
+            pending = {}
+
+            def record(done):
+                for future in done:
+                    i, cmd_info = pending.pop(future)
+                    output_file = Path(cmd_info['output'])
+                    status, error = future.result()
+                    print(f"[{i}] Generating: {output_file.name}")
+
+                    if status == 'success':
+                        self.stats['generated'] += 1
+                        print(f"           ✅ Success ({output_file.stat().st_size} bytes)")
+                    else:
+                        self.stats['generation_failed'] += 1
+                        print(f"           {status}")
+                        if error is not None:
+                            errors.write(json.dumps(error) + '\n')
+
+                    # The argv and its command string follow from these fields
+                    entry = {k: v for k, v in cmd_info.items() if k not in ('argv', 'command')}
+                    entry['status'] = status
+                    manifest.write(json.dumps(entry) + '\n')
+                    manifest.flush()
+
+            i = 0
+            for i, cmd_info in enumerate(commands, 1):
+                type_counts[cmd_info['type']] += 1
+                output_file = Path(cmd_info['output'])
+
+                # Skip if generated by an earlier run
+                if (skip_existing
+                        and (generated is None or (cmd_info['id'], cmd_info['output']) in generated)
+                        and output_file.name in existing):
+                    print(f"[{i}] SKIP: {output_file.name} (already exists)")
+                    self.stats['generated'] += 1
+                    continue
 
-            # Skip if exists
-            if skip_existing and output_file.exists():
-                print(f"[{i}/{total}] SKIP: {output_file.name} (already exists)")
-                self.stats['generated'] += 1
-                continue
+                pending[executor.submit(_generate_sample, cmd_info)] = (i, cmd_info)
+                if len(pending) >= 2 * max_workers:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    record(done)
 
-            print(f"[{i}/{total}] Generating: {output_file.name}")
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                record(done)
 
-            try:
-                # Execute ffmpeg command
-                result = subprocess.run(
-                    cmd_info['command'],
-                    shell=True,
-                    capture_output=True,
-                    text=True,
-                    timeout=120
-                )
-
-                if result.returncode == 0 and output_file.exists():
-                    self.stats['generated'] += 1
-                    print(f"           ✅ Success ({output_file.stat().st_size} bytes)")
-                else:
-                    self.stats['generation_failed'] += 1
-                    print(f"           ❌ Failed (exit code {result.returncode})")
-                    # Log error
-                    error_log = self.results_dir / f"generation_error_{cmd_info['id']}.log"
-                    with open(error_log, 'w') as f:
-                        f.write(f"Command: {cmd_info['command']}\n")
-                        f.write(f"Exit code: {result.returncode}\n")
-                        f.write(f"STDERR:\n{result.stderr}\n")
-
-            except subprocess.TimeoutExpired:
-                self.stats['generation_failed'] += 1
-                print(f"           ⏱️  Timeout")
-            except Exception as e:
-                self.stats['generation_failed'] += 1
-                print(f"           ❌ Error: {e}")
+        self.stats['total_commands'] = i
+
+        print(f"\n✅ Generated {i} commands")
+        print(f"   - Container + Video: {type_counts['container_video']}")
+        print(f"   - Container + Audio: {type_counts['container_audio']}")
+        print(f"   - Video + Pixel fmt: {type_counts['video_pixfmt']}")
+        print(f"   - Audio + Sample fmt: {type_counts['audio_samplefmt']}")
+        print(f"   - Audio + Layout: {type_counts['audio_layout']}")
+        print(f"   - Image formats: {type_counts['image']}")
 
         print(f"\n✅ Sample generation complete:")
         print(f"   - Successfully generated: {self.stats['generated']}")
@@ -744,106 +964,46 @@ class UltimateFormatTester:
         print("STEP 3: TESTING SAMPLES WITH SMART MEDIA MANAGER")
         print("="*80)
 
-        # Get all generated test files
-        test_files = sorted(self.output_dir.glob('test_*'))
+        # Get all generated test files; scandir entries carry the file type
+        # from the directory read and cache their stat result
+        with os.scandir(self.output_dir) as it:
+            test_files = sorted(
+                (entry for entry in it if entry.name.startswith('test_') and entry.is_file()),
+                key=lambda entry: entry.name,
+            )
         print(f"\nFound {len(test_files)} test samples")
 
-        for i, test_file in enumerate(test_files, 1):
-            print(f"\n[{i}/{len(test_files)}] Testing: {test_file.name}")
-
-            result = {
-                'file': test_file.name,
-                'size': test_file.stat().st_size,
-                'extension': test_file.suffix,
-                'timestamp': datetime.now().isoformat(),
-            }
-
-            # Run smart-media-manager
-            cmd = [
-                'uv', 'run', 'smart-media-manager',
-                str(test_file),
-                '--file',
-                '--skip-renaming',
-                '--skip-convert',
-                '--skip-compatibility-check',
-            ]
+        smm_cmd = _resolve_smm_command()
 
-            try:
-                proc = subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    text=True,
-                    timeout=180
-                )
-
-                result['exit_code'] = proc.returncode
-                result['stdout'] = proc.stdout
-                result['stderr'] = proc.stderr
-
-                # Parse import status
-                imported = False
-                compatible = False
-                refused = False
-
-                stdout = proc.stdout
-
-                # Extract statistics
-                if 'Total imported:' in stdout:
-                    match = re.search(r'Total imported:.*?(\d+)', stdout)
-                    if match:
-                        total_imported = int(match.group(1))
-                        imported = total_imported > 0
-
-                if 'Compatible (no conversion):' in stdout:
-                    match = re.search(r'Compatible \(no conversion\):.*?(\d+)', stdout)
-                    if match:
-                        compatible_count = int(match.group(1))
-                        compatible = compatible_count > 0
-
-                if 'Refused by Apple Photos:' in stdout:
-                    match = re.search(r'Refused by Apple Photos:.*?(\d+)', stdout)
-                    if match:
-                        refused_count = int(match.group(1))
-                        refused = refused_count > 0
-
-                result['imported'] = imported
-                result['compatible'] = compatible
-                result['refused'] = refused
-
-                # Save individual log
-                log_file = self.results_dir / f"{test_file.stem}.log"
-                with open(log_file, 'w') as f:
-                    f.write(f"Test file: {test_file}\n")
-                    f.write(f"Command: {' '.join(cmd)}\n")
-                    f.write(f"\n=== STDOUT ===\n{proc.stdout}\n")
-                    f.write(f"\n=== STDERR ===\n{proc.stderr}\n")
-                    f.write(f"\n=== EXIT CODE ===\n{proc.returncode}\n")
-
-                result['log_file'] = str(log_file)
+        # Each test blocks in its smart-media-manager child, so threads are
+        # enough. Finished results are streamed to a JSONL file as they arrive.
+        jsonl_file = self.results_dir / 'comprehensive_test_results.jsonl'
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor, open(jsonl_file, 'w') as jsonl:
+            futures = [executor.submit(_test_sample, entry, self.results_dir, smm_cmd) for entry in test_files]
+            for i, future in enumerate(as_completed(futures), 1):
+                result = future.result()
+                print(f"\n[{i}/{len(test_files)}] Testing: {result['file']}")
 
                 # Update stats
-                self.stats['tested'] += 1
-                if imported:
-                    self.stats['imported'] += 1
-                    print(f"           ✅ IMPORTED")
-                elif proc.returncode == 0:
-                    print(f"           ⚠️  Processed but not imported")
-                else:
+                if 'error' in result:
                     self.stats['failed'] += 1
-                    print(f"           ❌ FAILED (exit code {proc.returncode})")
-
-            except subprocess.TimeoutExpired:
-                result['error'] = 'timeout'
-                result['imported'] = False
-                self.stats['failed'] += 1
-                print(f"           ⏱️  TIMEOUT")
-            except Exception as e:
-                result['error'] = str(e)
-                result['imported'] = False
-                self.stats['failed'] += 1
-                print(f"           ❌ ERROR: {e}")
-
-            self.results.append(result)
+                    print("           ⏱️  TIMEOUT" if result['error'] == 'timeout' else f"           ❌ ERROR: {result['error']}")
+                else:
+                    self.stats['tested'] += 1
+                    if result['imported']:
+                        self.stats['imported'] += 1
+                        print(f"           ✅ IMPORTED")
+                    elif result['exit_code'] == 0:
+                        print(f"           ⚠️  Processed but not imported")
+                    else:
+                        self.stats['failed'] += 1
+                        print(f"           ❌ FAILED (exit code {result['exit_code']})")
+
+                jsonl.write(json.dumps(result) + '\n')
+                jsonl.flush()
+
+        # Keep the final report in sample order
+        self.results.extend(future.result() for future in futures)
 
         # Save results
         results_file = self.results_dir / 'comprehensive_test_results.json'
@@ -864,17 +1024,20 @@ class UltimateFormatTester:
         print("="*80)
 
         # Run analysis scripts
+        # The missing formats analysis only reads ffprobe output and the
+        # sample names, so it runs alongside the other two. The compatibility
+        # sheet reads the import flags analyze_test_results.py writes to
+        # test_results.parsed.json, so it waits for that script.
+        print("\nGenerating missing formats analysis...")
+        missing_formats = _start_script('scripts/analyze_missing_formats.py')
+
         print("\nRunning analysis...")
-        subprocess.run(['uv', 'run', 'python3', 'scripts/analyze_test_results.py'],
-                      cwd=Path.cwd())
+        _start_script('scripts/analyze_test_results.py').wait()
 
         print("\nGenerating compatibility sheet...")
-        subprocess.run(['uv', 'run', 'python3', 'scripts/create_compatibility_sheet.py'],
-                      cwd=Path.cwd())
+        _start_script('scripts/create_compatibility_sheet.py').wait()
 
-        print("\nGenerating missing formats analysis...")
-        subprocess.run(['uv', 'run', 'python3', 'scripts/analyze_missing_formats.py'],
-                      cwd=Path.cwd())
+        missing_formats.wait()
 
         print("\n✅ Reports generated:")
         print("   - COMPATIBILITY_SHEET.md")
@@ -885,6 +1048,7 @@ class UltimateFormatTester:
     def run_full_test(self, max_samples: int = None, skip_install: bool = False):
         """Run complete test pipeline."""
         self.stats['start_time'] = datetime.now()
+        started = time.perf_counter()  # monotonic, for the duration
 
         print("\n" + "="*80)
         print("ULTIMATE FORMAT COMPATIBILITY TEST")
@@ -899,11 +1063,8 @@ class UltimateFormatTester:
             # Step 1: Discover formats
             self.discover_all_formats()
 
-            # Step 2: Generate commands
-            self.generate_all_commands(max_samples=max_samples)
-
-            # Step 3: Generate samples
-            self.step2_generate_samples()
+            # Steps 2-3: Generate commands and samples from them as they are produced
+            self.step2_generate_samples(self.iter_commands(max_samples=max_samples))
 
             # Step 4: Test samples
             self.step3_test_samples()
@@ -919,7 +1080,7 @@ class UltimateFormatTester:
             traceback.print_exc()
 
         self.stats['end_time'] = datetime.now()
-        duration = (self.stats['end_time'] - self.stats['start_time']).total_seconds()
+        duration = time.perf_counter() - started
 
         # Final summary
         print("\n" + "="*80)
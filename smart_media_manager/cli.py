@@ -18,6 +18,7 @@ from collections import Counter
 from contextlib import suppress
 from dataclasses import dataclass, field
 from enum import IntEnum
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Callable, Iterable, Optional
 
@@ -3070,7 +3071,13 @@ def ensure_dependency(name: str) -> None:
         raise RuntimeError(f"Required dependency '{name}' is not available on PATH.")
 
 
-def ffprobe(path: Path) -> Optional[dict[str, Any]]:
+@lru_cache(maxsize=1024)
+def _ffprobe_output(path: str, size: int, mtime_ns: int) -> Optional[str]:
+    """Run ffprobe on a file and return its JSON output, or None if it fails.
+
+    Memoized: size and mtime_ns are not passed to ffprobe, they only key the
+    cache so a file that changed on disk is probed again.
+    """
     cmd = [
         "ffprobe",
         "-v",
@@ -3079,7 +3086,7 @@ def ffprobe(path: Path) -> Optional[dict[str, Any]]:
         "json",
         "-show_streams",
         "-show_format",
-        str(path),
+        path,
     ]
     try:
         result = subprocess.run(
@@ -3094,8 +3101,20 @@ def ffprobe(path: Path) -> Optional[dict[str, Any]]:
         return None
     if result.returncode != 0:
         return None
+    return result.stdout
+
+
+def ffprobe(path: Path) -> Optional[dict[str, Any]]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    output = _ffprobe_output(str(path), stat.st_size, stat.st_mtime_ns)
+    if output is None:
+        return None
+    # Parsed per call, so callers never share one mutable result
     try:
-        return json.loads(result.stdout)  # type: ignore[no-any-return]
+        return json.loads(output)  # type: ignore[no-any-return]
     except json.JSONDecodeError:
         return None
 
@@ -124,6 +124,39 @@ class TestFfprobe:
         assert "-show_streams" in call_args
         assert "-show_format" in call_args
 
+    @patch("smart_media_manager.cli.subprocess.run")
+    def test_ffprobe_reuses_probe_of_unchanged_file(self, mock_run, tmp_path):
+        """Test ffprobe runs once for repeated probes of an unchanged file."""
+        from smart_media_manager.cli import ffprobe
+
+        test_file = tmp_path / "test.mp4"
+        test_file.write_bytes(b"data")
+
+        mock_run.return_value = Mock(returncode=0, stdout='{"streams": []}')
+
+        first = ffprobe(test_file)
+        first["streams"].append("mutated")
+        second = ffprobe(test_file)
+
+        assert second == {"streams": []}
+        mock_run.assert_called_once()
+
+    @patch("smart_media_manager.cli.subprocess.run")
+    def test_ffprobe_probes_again_after_file_changes(self, mock_run, tmp_path):
+        """Test ffprobe runs again when the file's size or mtime changed."""
+        from smart_media_manager.cli import ffprobe
+
+        test_file = tmp_path / "test.mp4"
+        test_file.write_bytes(b"data")
+
+        mock_run.return_value = Mock(returncode=0, stdout="{}")
+
+        ffprobe(test_file)
+        test_file.write_bytes(b"more data")
+        ffprobe(test_file)
+
+        assert mock_run.call_count == 2
+
 
 class TestExtractAndNormalizeMetadata:
     """Tests for extract_and_normalize_metadata function."""